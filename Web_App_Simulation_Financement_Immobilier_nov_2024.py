@@ -1,12 +1,21 @@
 import streamlit as st
 import pandas as pd
-import numpy_financial as npf
 import plotly.graph_objects as go
 from PIL import Image
 import base64
-from io import BytesIO
-from fpdf import FPDF
 import locale
+import time
+import functools
+from cache_resultats import lire_resultats, lister_resultats
+from calculs_financement import comparer_mensualites_taux_endettement, comparer_mensualites_valeur_bien
+from comparateur_offres import CRITERES_CLASSEMENT, actualiser_offres_exemple, comparer_offres, offres_exemple
+from graphe_simulation import GrapheSimulation
+from rapport_pdf import creer_pdf
+from resultats_simulation import (NOMS_SAISIES, calculer_resultats, format_number_fr, format_taeg, graphiques_simulation,
+                                  tableau_resultats)
+
+# Début de l'exécution complète du script, chronométrée comme les fragments
+debut_execution = time.perf_counter()
 
 # Définir le format local pour l'affichage des nombres
 try:
@@ -14,14 +23,6 @@ try:
 except locale.Error:
     print("Impossible de définir la locale française, la locale par défaut du système sera utilisée.")
 
-def format_number_fr(number):
-    """
-    Formate un nombre en utilisant une virgule comme séparateur décimal
-    et un espace comme séparateur des milliers, sans dépendre de locale.
-    """
-    # Formater avec deux décimales et un séparateur des milliers
-    return f"{number:,.2f}".replace(',', ' ').replace('.', ',')
-
 # Fonction pour convertir l'image en base64
 def get_image_base64(image_path):
     """
@@ -143,79 +144,18 @@ def afficher_et_valider_etape(texte, valeur_par_defaut, etape, min_value=None, m
         return valeur, True
     return valeur, False
 
+# Le plan de financement est complet lorsque toutes les saisies de l'assistant ont été validées
+def plan_complet():
+    return all(nom in st.session_state for nom in NOMS_SAISIES)
+
 # Fonction principale pour la simulation de financement
 def simuler_financement_avec_calculs_et_recommandations():
     """
     Simule le financement immobilier en calculant les différents coûts et en renvoyant un DataFrame avec les résultats.
     Utilisation de la mise en cache pour améliorer les performances.
     """
-    revenu_annuel = st.session_state.revenu_annuel
-    valeur_bien = st.session_state.valeur_bien
-    apport = st.session_state.apport_personnel
-    taux_interet = st.session_state.taux_interet / 100
-    duree_pret_annees = st.session_state.duree_pret
-    assurance_annuelle = st.session_state.assurance_emprunteur_annuelle
-    frais_notaire = st.session_state.frais_de_notaire
-    frais_garantie = st.session_state.frais_de_garantie
-    frais_dossier = st.session_state.frais_de_dossier
-    frais_courtage = st.session_state.frais_de_courtage
-    frais_agence = st.session_state.frais_agence_immobiliere
-    ptz = st.session_state.ptz
-    pel = st.session_state.pel
-
-    montant_pret = valeur_bien - apport
-    cout_total_frais = round(frais_notaire + frais_garantie + frais_dossier + frais_courtage + frais_agence + assurance_annuelle * duree_pret_annees, 2)
-    montant_total_finance = round(montant_pret + cout_total_frais - ptz - pel, 2)
-
-    taux_interet_mensuel = taux_interet / 12
-    duree_pret_mois = duree_pret_annees * 12
-    assurance_mensuelle = round(assurance_annuelle / 12, 2)
-
-    mensualite = round(npf.pmt(taux_interet_mensuel, duree_pret_mois, -montant_total_finance), 2) if taux_interet_mensuel > 0 else round(montant_total_finance / duree_pret_mois, 2)
-    
-    mensualite_totale = round(mensualite + assurance_mensuelle, 2)
-    paiement_total = round((mensualite * duree_pret_mois) + assurance_annuelle * duree_pret_annees, 2)
-    interet_total = round(paiement_total - montant_pret, 2)
-    revenu_mensuel = round(revenu_annuel / 12, 2)
-    taux_endettement = round((mensualite_totale / revenu_mensuel) * 100, 2)
-    
-    df_resultats = pd.DataFrame({
-        "Description": [
-            "Revenu annuel avant impôt", "Valeur du bien/ prix d'achat", "Apport personnel", 
-            "Frais de notaire", "Frais de garantie", "Frais de dossier", 
-            "Frais de courtage", "Frais d'agence immobilière", 
-            "Assurance emprunteur annuelle", "Assurance emprunteur totale", 
-            "PTZ", "PEL", "Taux d'intérêt", 
-            "Durée du prêt (années)", "Paiement total", 
-            "Intérêts totaux", "Mensualité hors assurance", 
-            "Mensualité avec assurance", "Montant total financé", 
-            "Taux d'endettement (mensualité avec assurance)"
-        ],
-        "Valeur": [
-            f"{format_number_fr(revenu_annuel)} €", 
-            f"{format_number_fr(valeur_bien)} €", 
-            f"{format_number_fr(apport)} €", 
-            f"{format_number_fr(frais_notaire)} €", 
-            f"{format_number_fr(frais_garantie)} €", 
-            f"{format_number_fr(frais_dossier)} €", 
-            f"{format_number_fr(frais_courtage)} €", 
-            f"{format_number_fr(frais_agence)} €", 
-            f"{format_number_fr(assurance_annuelle)} €", 
-            f"{format_number_fr(assurance_annuelle * duree_pret_annees)} €", 
-            f"{format_number_fr(ptz)} €", 
-            f"{format_number_fr(pel)} €", 
-            f"{format_number_fr(taux_interet * 100)} %", 
-            f"{duree_pret_annees} ans", 
-            f"{format_number_fr(paiement_total)} €", 
-            f"{format_number_fr(interet_total)} €", 
-            f"{format_number_fr(mensualite)} €", 
-            f"{format_number_fr(mensualite_totale)} €", 
-            f"{format_number_fr(montant_total_finance)} €", 
-            f"Prédiction du taux estimé à {format_number_fr(taux_endettement)} %"
-        ]
-    })
-    
-    return df_resultats
+    saisies = {nom: st.session_state[nom] for nom in NOMS_SAISIES}
+    return tableau_resultats(saisies, mode_centimes=st.session_state.get("mode_centimes", False))
 
 # Fonction pour actualiser le financement avec la nouvelle mensualité souhaitée
 def actualiser_financement(df_resultats, nouvelle_mensualite):
@@ -265,8 +205,7 @@ def actualiser_financement(df_resultats, nouvelle_mensualite):
 # Fonction pour tracer le graphique de comparaison des mensualités en courbe
 def tracer_graphique_comparaison_mensualites_courbe(mensualite_actuelle, valeur_bien_actuelle):
     # Mensualités croissantes et décroissantes avec un écart de 20 €
-    mensualites = [mensualite_actuelle + i * 20 for i in range(-10, 11)]
-    valeurs_bien = [round((mensualite / mensualite_actuelle) * valeur_bien_actuelle, 2) for mensualite in mensualites]
+    mensualites, valeurs_bien = comparer_mensualites_valeur_bien(mensualite_actuelle, valeur_bien_actuelle)
 
     fig = go.Figure()
 
@@ -318,9 +257,7 @@ def tracer_graphique_comparaison_mensualites_courbe(mensualite_actuelle, valeur_
 
 # Fonction pour tracer le graphique de comparaison des mensualités et taux d'endettement
 def tracer_graphique_comparaison_taux_endettement(mensualite_actuelle, revenu_annuel):
-    mensualites = [mensualite_actuelle + i * 20 for i in range(-10, 11)]
-    revenu_mensuel = revenu_annuel / 12
-    taux_endettements = [round((mensualite / revenu_mensuel) * 100, 2) for mensualite in mensualites]
+    mensualites, taux_endettements = comparer_mensualites_taux_endettement(mensualite_actuelle, revenu_annuel)
 
     fig = go.Figure()
 
@@ -370,10 +307,114 @@ def tracer_graphique_comparaison_taux_endettement(mensualite_actuelle, revenu_an
     # Afficher le graphique
     st.plotly_chart(fig)
 
+# Curseurs de la simulation interactive : (saisie, libellé, minimum, maximum, pas)
+CURSEURS_SIMULATION_INTERACTIVE = [
+    ("revenu_annuel", "Revenu annuel avant impôt (€)", 0.0, 300000.0, 500.0),
+    ("valeur_bien", "Valeur du bien / prix d'achat (€)", 0.0, 1500000.0, 1000.0),
+    ("apport_personnel", "Apport personnel (€)", 0.0, 1500000.0, 1000.0),
+    ("taux_interet", "Taux d'intérêt (%)", 0.0, 15.0, 0.01),
+    ("duree_pret", "Durée du prêt (années)", 1, 40, 1),
+    ("assurance_emprunteur_annuelle", "Assurance emprunteur annuelle (€)", 0.0, 20000.0, 10.0),
+    ("frais_de_notaire", "Frais de notaire (€)", 0.0, 150000.0, 100.0),
+    ("frais_de_garantie", "Frais de garantie (€)", 0.0, 30000.0, 10.0),
+    ("frais_de_dossier", "Frais de dossier (€)", 0.0, 20000.0, 10.0),
+    ("frais_de_courtage", "Frais de courtage (€)", 0.0, 20000.0, 10.0),
+    ("frais_agence_immobiliere", "Frais d'agence immobilière (€)", 0.0, 80000.0, 100.0),
+    ("ptz", "Montant du Prêt à Taux Zéro (PTZ) (€)", 0.0, 200000.0, 500.0),
+    ("pel", "Montant du Plan Épargne Logement (PEL) (€)", 0.0, 100000.0, 500.0),
+]
+
+# Fonctions de rappel de la simulation interactive
+def modifier_saisie_interactive(nom):
+    """
+    Fixe la saisie modifiée par l'utilisateur dans le graphe : seuls ses descendants seront recalculés.
+    """
+    st.session_state.graphe_simulation.definir(nom, st.session_state[f"interactif_{nom}"])
+
+def retablir_valeurs_par_defaut():
+    """
+    Rend à toutes les saisies leur valeur par défaut, déduite de la valeur du bien ou du montant emprunté.
+    """
+    for nom, *_ in CURSEURS_SIMULATION_INTERACTIVE:
+        st.session_state.graphe_simulation.liberer(nom)
+
+# Fonctions pour générer les rapports PDF, mis en cache sur leurs entrées :
+# une réexécution sans changement des saisies ne reconstruit ni le PDF ni ses graphiques
+@st.cache_data(max_entries=32, show_spinner=False)
+def pdf_resultats_simulation(saisies, mode_centimes):
+    """
+    Construit le PDF des résultats du plan de financement avec les deux graphiques de comparaison
+    et le tableau d'amortissement, rendus à partir des résultats numériques de la simulation.
+    """
+    resultats = calculer_resultats(saisies, mode_centimes)
+    df_resultats = tableau_resultats(saisies, resultats=resultats)
+    return creer_pdf(df_resultats, graphiques=graphiques_simulation(saisies, resultats)).getvalue()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def pdf_resultats_actualises(df_resultats_actualise):
+    """
+    Construit le PDF des résultats actualisés pour la mensualité souhaitée, sans graphiques.
+    """
+    return creer_pdf(df_resultats_actualise).getvalue()
+
+# Décorateur pour les fragments : parties de la page réexécutées seules lors d'une interaction
+def fragment_chronometre(fonction):
+    """
+    Déclare une fonction comme fragment Streamlit : une interaction avec un de ses widgets ne réexécute
+    que ce fragment, et non l'en-tête, le menu ou le pied de page.
+    La durée de sa dernière exécution est conservée dans st.session_state.durees_fragments (en ms).
+    """
+    @functools.wraps(fonction)
+    def executer(*args, **kwargs):
+        debut = time.perf_counter()
+        resultat = fonction(*args, **kwargs)
+        st.session_state.setdefault("durees_fragments", {})[fonction.__name__] = (time.perf_counter() - debut) * 1000
+        return resultat
+    return st.fragment(executer)
+
+# Style des tableaux HTML de l'application, avec des lignes alternées
+STYLE_TABLEAU = """
+<style>
+.table-style {
+    margin-left: auto;
+    margin-right: auto;
+    width: 100%;
+    border-collapse: collapse;
+}
+.table-style th, .table-style td {
+    border: 1px solid #ddd;
+    padding: 8px;
+    text-align: center;
+}
+.table-style th {
+    background-color: #9B4819;
+    color: white;
+}
+/* Lignes paires */
+.table-style tr:nth-child(even) {
+    background-color: #F0F2F6;  /* Couleur des lignes paires */
+}
+/* Lignes impaires */
+.table-style tr:nth-child(odd) {
+    background-color: #ffffff;  /* Couleur des lignes impaires */
+}
+</style>
+"""
+
+# Fonction pour afficher un tableau sous un titre centré, avec le style des tableaux de l'application
+def afficher_tableau(df, titre):
+    """
+    Convertit le DataFrame en tableau HTML sans index et l'affiche sous le titre donné.
+    """
+    table_html = df.to_html(index=False, justify="center", border=0, classes="table-style")
+    st.markdown(STYLE_TABLEAU, unsafe_allow_html=True)
+    st.markdown(f"<h2 style='text-align: center;'>{titre}</h2>{table_html}", unsafe_allow_html=True)
+
 # Ajout de la gestion des fichiers (CSV, Excel, PDF)
-def telecharger_resultats(df_resultats):
+def telecharger_resultats(df_resultats, pdf):
     """
     Fonction permettant de télécharger les résultats en CSV, Excel ou PDF.
+    Le PDF est fourni déjà construit (contenu du fichier), par une des fonctions en cache.
     """
     # Télécharger en CSV
     df_resultats_csv = df_resultats.copy()
@@ -389,7 +430,6 @@ def telecharger_resultats(df_resultats):
 
 
     # Télécharger en PDF
-    pdf = creer_pdf(df_resultats)
     st.download_button(
         label="Télécharger les résultats en PDF",
         data=pdf,
@@ -397,129 +437,110 @@ def telecharger_resultats(df_resultats):
         mime="application/pdf",
     )
 
-def creer_pdf(df_resultats, logo_path='1_Logo.png'):
-    """
-    Crée un fichier PDF des résultats de la simulation avec un en-tête et un pied de page
-    personnalisés incluant le logo, le titre, et la mention des droits.
-    Le tableau est centré, et les textes longs dans les cellules sont renvoyés à la ligne.
-    """
-    class PDF(FPDF):
-        def header(self):
-            # Ajouter le logo
-            self.image(logo_path, 10, 8, 25)  # (x, y, largeur)
-            
-            # Ajustement de la position pour éviter le chevauchement avec le logo
-            self.set_xy(35, 10)  # Positionner le texte un peu plus à droite pour éviter le chevauchement
-            
-            # Titre principal
-            self.set_font('Arial', 'B', 17)
-            self.cell(150, 10, "Simulation de financement immobilier", ln=True, align='C')
-            
-            # Phrase descriptive centrée (ajustée)
-            self.set_font('Arial', '', 12)
-            self.cell(200, 10, "Cette application vous permet de simuler votre financement immobilier", ln=True, align='C')
-            self.cell(200, 5, "en fonction de divers paramètres financiers.", ln=True, align='C')
-            
-            # Ligne de séparation
-            self.set_draw_color(169, 169, 169)  # Couleur gris pour la ligne
-            self.set_line_width(0.5)
-            self.line(10, 40, 200, 40)  # Ligne horizontale (x1, y1, x2, y2)
-            self.ln(10)  # Espacement après l'en-tête
-        
-        def footer(self):
-            # Positionnement à 1.5 cm du bas
-            self.set_y(-30)
-            
-            # Ligne de séparation
-            self.set_draw_color(169, 169, 169)
-            self.set_line_width(0.5)
-            self.line(10, self.get_y(), 200, self.get_y())  # Ligne horizontale
-            
-            # Logo dans le pied de page
-            self.image(logo_path, 95, self.get_y() + 5, 20)  # (x, y, largeur)
-            self.ln(20)
-            
-            # Texte du pied de page
-            self.set_font('Arial', 'I', 8)
-            self.cell(0, 10, "© 2024 - Simulation de financement immobilier. Réalisé par CBorges. Tous droits réservés.", align='C')
-
-    # Initialiser le PDF
-    pdf = PDF()
-    pdf.add_page()
-    
-    # Taille de la police pour les tableaux
-    pdf.set_font('Arial', 'B', 12)
-    
-    # Largeurs des colonnes
-    col_width_desc = 90
-    col_width_value = 80
-    line_height = pdf.font_size * 1.5
+# Fragment des résultats de la simulation (page Plan de financement)
+@fragment_chronometre
+def fragment_resultats_simulation():
+    df_resultats = simuler_financement_avec_calculs_et_recommandations()
+
+    # Sélectionner uniquement les colonnes "Description" et "Valeurs"
+    df_resultats = df_resultats[['Description', 'Valeur']]
     
-    # Calculer la position initiale pour centrer le tableau
-    table_x = (210 - (col_width_desc + col_width_value)) / 2
-    pdf.set_x(table_x)
-
-    # Couleurs pour l'en-tête du tableau
-    pdf.set_fill_color(155, 72, 25)  # Couleur de l'en-tête (code couleur #9B4819)
-    pdf.set_text_color(255, 255, 255)  # Texte en blanc pour l'en-tête
-
-    # En-têtes du tableau
-    pdf.cell(col_width_desc, line_height, 'Description', border=1, align='C', fill=True)
-    pdf.cell(col_width_value, line_height, 'Valeur', border=1, align='C', fill=True)
-    pdf.ln(line_height)
+    # Afficher le tableau en HTML
+    afficher_tableau(df_resultats, "Résultats de la Simulation")
     
-    # Remplir les cellules du tableau
-    pdf.set_font('Arial', '', 10)  # Reset font for the table content
-    pdf.set_text_color(0, 0, 0)  # Texte noir pour le contenu
-    fill = False  # Toggle for row background color
-
-    # Fonction pour renvoyer à la ligne si le texte est trop long
-    def multi_cell_with_centering(pdf, width, height, text, fill):
-        # Sauvegarder la position actuelle
-        x = pdf.get_x()
-        y = pdf.get_y()
-        
-        # Centrer la cellule
-        pdf.multi_cell(width, height, text, border=1, align='C', fill=fill)
-        
-        # Retourner à la position de départ pour la prochaine cellule
-        pdf.set_xy(x + width, y)
-
-    # Obtenir la hauteur maximale de chaque ligne et ajuster
-    def ajuster_ligne(pdf, desc, val, col_width_desc, col_width_value, line_height, fill):
-        # Calcul de la hauteur requise pour chaque cellule de la ligne
-        desc_height = pdf.get_string_width(desc) / col_width_desc * line_height
-        val_height = pdf.get_string_width(val) / col_width_value * line_height
-        max_height = max(desc_height, val_height, line_height)  # Obtenir la hauteur max
-
-        # Fixer la hauteur de la ligne pour les deux colonnes en fonction de la cellule la plus haute
-        pdf.set_x(table_x)  # S'assurer que le tableau reste centré
-        pdf.multi_cell(col_width_desc, max_height, desc, border=1, align='C', fill=fill)
-        pdf.set_xy(table_x + col_width_desc, pdf.get_y() - max_height)  # Retour pour ajouter la valeur
-        pdf.multi_cell(col_width_value, max_height, val, border=1, align='C', fill=fill)
-
-    for index, row in df_resultats.iterrows():
-        description = row['Description']
-        valeur = row['Valeur'].replace('€', 'EUR').replace('.', ',')  # Remplacer le caractère '€' par 'EUR' et le séparateur décimal par une virgule
-
-        # Couleur de fond alternée
-        if fill:
-            pdf.set_fill_color(240, 240, 240)  # Gris clair
-        else:
-            pdf.set_fill_color(255, 255, 255)  # Blanc
-
-        # Utilisation de ajuster_ligne pour ajuster automatiquement la hauteur de la ligne
-        ajuster_ligne(pdf, description, valeur, col_width_desc, col_width_value, line_height, fill)
-
-        # Alterner la couleur de fond
-        fill = not fill
+    # Saut de ligne
+    st.markdown(f"""<br>""", unsafe_allow_html=True)
+
+    # Ajouter la possibilité de télécharger les résultats, avec les graphiques dans le PDF
+    saisies = {nom: st.session_state[nom] for nom in NOMS_SAISIES}
+    telecharger_resultats(df_resultats, pdf_resultats_simulation(saisies, st.session_state.get("mode_centimes", False)))
+
+# Fragment de la mensualité souhaitée : seul le tableau actualisé est réexécuté quand elle change
+@fragment_chronometre
+def fragment_mensualite_souhaitee():
+    # Barre d'entrée pour la nouvelle mensualité souhaitée
+    nouvelle_mensualite = st.number_input("Mensualité souhaitée (€)", value=1000.0, min_value=0.0, key="mensualite_souhaitee")
+
+    # Simulation des résultats après actualisation
+    if plan_complet():
+        df_resultats = simuler_financement_avec_calculs_et_recommandations()
+        df_resultats_actualise = actualiser_financement(df_resultats, nouvelle_mensualite)
+
+        # Sélectionner uniquement les colonnes "Description" et "Valeurs"
+        df_resultats_actualise = df_resultats_actualise[['Description', 'Valeur']]
+
+        # Afficher le tableau en HTML
+        afficher_tableau(df_resultats_actualise, "Résultats après actualisation")
     
-    # Sauvegarde du PDF dans un buffer BytesIO
-    pdf_output = BytesIO()
-    pdf_content = pdf.output(dest='S').encode('latin1')  # Générer le contenu du PDF en mémoire
-    pdf_output.write(pdf_content)  # Écrire le contenu dans BytesIO
-    pdf_output.seek(0)  # Revenir au début du buffer avant de le retourner
-    return pdf_output
+        # Saut de ligne
+        st.markdown(f"""<br>""", unsafe_allow_html=True)
+
+        # Ajouter la possibilité de télécharger les résultats
+        telecharger_resultats(df_resultats_actualise, pdf_resultats_actualises(df_resultats_actualise))
+    else:
+        st.warning("Veuillez d'abord compléter le plan de financement.")
+
+# Fragment du comparateur d'offres : la modification d'une offre ne réexécute que le tableau et le classement
+@fragment_chronometre
+def fragment_comparateur_offres(projet):
+    df_offres = st.data_editor(
+        st.session_state.offres_initiales,
+        num_rows="dynamic",
+        hide_index=True,
+        key="offres",
+        column_config={
+            "banque": st.column_config.TextColumn("Banque"),
+            "taux_interet": st.column_config.NumberColumn("Taux d'intérêt (%)", min_value=0.0, max_value=15.0, step=0.01, format="%.2f"),
+            "duree_pret": st.column_config.NumberColumn("Durée (années)", min_value=1, max_value=40, step=1),
+            "assurance_emprunteur_annuelle": st.column_config.NumberColumn("Assurance annuelle (€)", min_value=0.0, format="%.2f"),
+            "frais_de_dossier": st.column_config.NumberColumn("Frais de dossier (€)", min_value=0.0, format="%.2f"),
+            "frais_de_garantie": st.column_config.NumberColumn("Frais de garantie (€)", min_value=0.0, format="%.2f"),
+            "frais_de_courtage": st.column_config.NumberColumn("Frais de courtage (€)", min_value=0.0, format="%.2f"),
+        }
+    )
+
+    # Offres telles que modifiées, reprises si le projet change
+    st.session_state.offres_saisies = df_offres
+
+    # Toutes les offres sont évaluées ensemble à chaque modification
+    df_comparatif = comparer_offres(projet, df_offres)
+    if df_comparatif.empty:
+        st.warning("Veuillez saisir au moins une offre avec un taux d'intérêt et une durée.")
+        return
+
+    critere = st.radio("Classer les offres par :", list(CRITERES_CLASSEMENT), horizontal=True, key="critere_offres")
+    df_comparatif = df_comparatif.sort_values(CRITERES_CLASSEMENT[critere], kind="stable")
+    meilleure_offre = df_comparatif.iloc[0]
+    st.success(f"Meilleure offre ({critere.lower()}) : {meilleure_offre['banque']}, "
+               f"coût total du crédit de {format_number_fr(meilleure_offre['cout_credit'])} €, "
+               f"mensualité de {format_number_fr(meilleure_offre['mensualite_totale'])} €.")
+    if df_comparatif["au_dessus_seuil"].any():
+        st.warning("Certaines offres dépassent un taux d'endettement de 35 %.")
+
+    df_classement = pd.DataFrame({
+        "Banque": df_comparatif["banque"],
+        "Taux d'intérêt": [f"{format_number_fr(valeur)} %" for valeur in df_comparatif["taux_interet"]],
+        "Durée": [f"{valeur} ans" for valeur in df_comparatif["duree_pret"]],
+        "Mensualité avec assurance": [f"{format_number_fr(valeur)} €" for valeur in df_comparatif["mensualite_totale"]],
+        "Coût total du crédit": [f"{format_number_fr(valeur)} €" for valeur in df_comparatif["cout_credit"]],
+        "TAEG": [format_taeg(valeur) for valeur in df_comparatif["taeg"]],
+        "Taux d'endettement": [f"{format_number_fr(valeur)} %" for valeur in df_comparatif["taux_endettement"]],
+        "Rang coût": df_comparatif["rang_cout_credit"],
+        "Rang mensualité": df_comparatif["rang_mensualite_totale"],
+        "Rang endettement": df_comparatif["rang_taux_endettement"],
+    })
+    afficher_tableau(df_classement, "Classement des offres")
+
+    # Décomposition du coût total du crédit par offre
+    fig = go.Figure(go.Bar(
+        x=df_comparatif["banque"],
+        y=df_comparatif["cout_credit"],
+        marker_color=["#9B4819" if rang == 1 else "#E0A47A" for rang in df_comparatif["rang_cout_credit"]],
+        text=[f"{format_number_fr(valeur)} €" for valeur in df_comparatif["cout_credit"]],
+        textposition="outside"
+    ))
+    fig.update_layout(title="Coût total du crédit par offre", xaxis_title="Offre", yaxis_title="Coût total du crédit (€)")
+    st.plotly_chart(fig)
 
 # --- Menu de navigation ---
 st.sidebar.title("Menu")
@@ -528,14 +549,17 @@ st.sidebar.title("Menu")
 if "page" not in st.session_state:
     st.session_state.page = "Présentation"
 
-# Utiliser un selectbox pour la navigation
-page = st.sidebar.selectbox(
+# Utiliser un selectbox pour la navigation, lié à st.session_state.page par sa clé
+pages = ("Présentation", "Plan de financement", "Mensualité souhaitée", "Comparaison des mensualités", "Simulation interactive",
+         "Comparaison des offres", "Résultats enregistrés")
+st.sidebar.selectbox(
     "Aller à :",
-    ("Présentation", "Plan de financement", "Mensualité souhaitée", "Comparaison des mensualités"),
-    index=0 if st.session_state.page == "Présentation" else 1
+    pages,
+    key="page"
 )
 
-st.session_state.page = page
+# Mode de calcul exact : montants en centimes entiers, totaux égaux à la somme de l'échéancier
+st.sidebar.checkbox("Calcul exact au centime", key="mode_centimes")
 
 # Page 1 : Présentation
 if st.session_state.page == "Présentation":
@@ -557,8 +581,9 @@ if st.session_state.page == "Présentation":
     4. 🔄 Si vous souhaitez corriger une erreur, utilisez le bouton **"Reset"** pour réinitialiser toutes les données.
     5. 💸 Dans **"Mensualité souhaitée"**, entrez un montant pour obtenir des recommandations personnalisées.
     6. 📊 Allez dans **"Comparaison des mensualités"** pour visualiser l'impact de vos décisions financières, en fonction des informations fournies dans le **Plan de financement**.
-    7. 💾 **Téléchargez votre simulation** au format de votre choix : CSV ou PDF.
-    8. 🖨️ Avec le PDF, vous pourrez **imprimer** ou **partager** votre simulation avec votre conseiller bancaire pour être mieux préparé lors de vos rendez-vous.
+    7. 🏦 Dans **"Comparaison des offres"**, saisissez les offres reçues de vos banques pour les classer par coût total, mensualité et taux d'endettement.
+    8. 💾 **Téléchargez votre simulation** au format de votre choix : CSV ou PDF.
+    9. 🖨️ Avec le PDF, vous pourrez **imprimer** ou **partager** votre simulation avec votre conseiller bancaire pour être mieux préparé lors de vos rendez-vous.
 
     """)
     
@@ -761,121 +786,19 @@ elif st.session_state.page == "Plan de financement":
 
     # Simulation des résultats après la dernière étape
     if st.session_state.step == 14:
-        df_resultats = simuler_financement_avec_calculs_et_recommandations()
-
-        # Sélectionner uniquement les colonnes "Description" et "Valeurs"
-        df_resultats = df_resultats[['Description', 'Valeur']]
-        
-        # Convertir le DataFrame en HTML sans index
-        table_html = df_resultats.to_html(index=False, justify="center", border=0, classes="table-style")
-        
-        # Ajouter du CSS pour styliser le tableau avec des lignes alternées
-        st.markdown(
-            """
-            <style>
-            .table-style {
-                margin-left: auto;
-                margin-right: auto;
-                width: 100%;
-                border-collapse: collapse;
-            }
-            .table-style th, .table-style td {
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: center;
-            }
-            .table-style th {
-                background-color: #9B4819;
-                color: white;
-            }
-            /* Lignes paires */
-            .table-style tr:nth-child(even) {
-                background-color: #F0F2F6;  /* Couleur des lignes paires */
-            }
-            /* Lignes impaires */
-            .table-style tr:nth-child(odd) {
-                background-color: #ffffff;  /* Couleur des lignes impaires */
-            }
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
-
-        # Afficher le tableau en HTML
-        st.markdown(f"<h2 style='text-align: center;'>Résultats de la Simulation</h2>{table_html}", unsafe_allow_html=True)
-        
-        # Saut de ligne
-        st.markdown(f"""<br>""", unsafe_allow_html=True)
-
-        # Ajouter la possibilité de télécharger les résultats
-        telecharger_resultats(df_resultats)
+        fragment_resultats_simulation()
 
 # Page 3 : Entrer la nouvelle mensualité souhaitée
 elif st.session_state.page == "Mensualité souhaitée":
     st.markdown("<h1 style='text-align: center;'>🏡 Mensualité souhaitée</h1>", unsafe_allow_html=True)
 
-    # Barre d'entrée pour la nouvelle mensualité souhaitée
-    nouvelle_mensualite = st.number_input("Mensualité souhaitée (€)", value=1000.0, min_value=0.0)
-
-    # Simulation des résultats après actualisation
-    if "revenu_annuel" in st.session_state:
-        df_resultats = simuler_financement_avec_calculs_et_recommandations()
-        df_resultats_actualise = actualiser_financement(df_resultats, nouvelle_mensualite)
-
-        # Sélectionner uniquement les colonnes "Description" et "Valeurs"
-        df_resultats_actualise = df_resultats_actualise[['Description', 'Valeur']]
-
-        # Convertir le DataFrame en HTML sans index
-        table_html = df_resultats_actualise.to_html(index=False, justify="center", border=0, classes="table-style")
-
-        # Ajouter du CSS pour styliser le tableau avec des lignes alternées
-        st.markdown(
-            """
-            <style>
-            .table-style {
-                margin-left: auto;
-                margin-right: auto;
-                width: 100%;
-                border-collapse: collapse;
-            }
-            .table-style th, .table-style td {
-                border: 1px solid #ddd;
-                padding: 8px;
-                text-align: center;
-            }
-            .table-style th {
-                background-color: #9B4819;
-                color: white;
-            }
-            /* Lignes paires */
-            .table-style tr:nth-child(even) {
-                background-color: #F0F2F6;  /* Couleur des lignes paires */
-            }
-            /* Lignes impaires */
-            .table-style tr:nth-child(odd) {
-                background-color: #ffffff;  /* Couleur des lignes impaires */
-            }
-            </style>
-            """,
-            unsafe_allow_html=True
-        )
-
-        # Afficher le tableau en HTML
-        st.markdown(f"<h2 style='text-align: center;'>Résultats après actualisation</h2>{table_html}", unsafe_allow_html=True)
-        
-        # Saut de ligne
-        st.markdown(f"""<br>""", unsafe_allow_html=True)
-
-        # Ajouter la possibilité de télécharger les résultats
-        telecharger_resultats(df_resultats_actualise)
-    else:
-        st.warning("Veuillez d'abord compléter le plan de financement.")
+    fragment_mensualite_souhaitee()
 
 # Page 4 : Comparaison entre la mensualité actuelle et souhaitée
 elif st.session_state.page == "Comparaison des mensualités":
     st.markdown("<h1 style='text-align: center;'>📊 Comparaison des mensualités</h1>", unsafe_allow_html=True)
 
-    if "revenu_annuel" in st.session_state:
+    if plan_complet():
         df_resultats = simuler_financement_avec_calculs_et_recommandations()
         
         # Utiliser la valeur brute directement sans formatage pour éviter les erreurs de conversion
@@ -896,6 +819,99 @@ elif st.session_state.page == "Comparaison des mensualités":
     else:
         st.warning("Veuillez d'abord compléter le plan de financement.")
 
+# Page 5 : Simulation interactive, recalcul incrémental à chaque déplacement de curseur
+elif st.session_state.page == "Simulation interactive":
+    st.markdown("<h1 style='text-align: center;'>🎚️ Simulation interactive</h1>", unsafe_allow_html=True)
+
+    if "graphe_simulation" not in st.session_state:
+        st.session_state.graphe_simulation = GrapheSimulation()
+    graphe = st.session_state.graphe_simulation
+
+    # Recalcul des seules grandeurs invalidées par la dernière modification
+    debut = time.perf_counter()
+    recalcules = graphe.recalculer()
+    duree_recalcul = (time.perf_counter() - debut) * 1000
+
+    st.button("Rétablir les valeurs par défaut", on_click=retablir_valeurs_par_defaut)
+    colonnes = st.columns(2)
+    for indice, (nom, libelle, minimum, maximum, pas) in enumerate(CURSEURS_SIMULATION_INTERACTIVE):
+        # Les saisies déduites suivent les valeurs du graphe tant que l'utilisateur ne les a pas fixées
+        st.session_state[f"interactif_{nom}"] = type(minimum)(min(max(graphe.valeur(nom), minimum), maximum))
+        colonnes[indice % 2].slider(
+            libelle + ("" if graphe.est_fixee(nom) else " (par défaut)"),
+            min_value=minimum,
+            max_value=maximum,
+            step=pas,
+            key=f"interactif_{nom}",
+            on_change=modifier_saisie_interactive,
+            args=(nom,)
+        )
+
+    df_interactif = pd.DataFrame({
+        "Description": [
+            "Montant emprunté", "Montant total financé", "Mensualité hors assurance",
+            "Mensualité avec assurance", "Paiement total", "Intérêts totaux",
+            "TAEG (frais et assurance inclus)", "Taux d'endettement (mensualité avec assurance)"
+        ],
+        "Valeur": [
+            f"{format_number_fr(graphe.valeur('montant_pret'))} €",
+            f"{format_number_fr(graphe.valeur('montant_total_finance'))} €",
+            f"{format_number_fr(graphe.valeur('mensualite'))} €",
+            f"{format_number_fr(graphe.valeur('mensualite_totale'))} €",
+            f"{format_number_fr(graphe.valeur('paiement_total'))} €",
+            f"{format_number_fr(graphe.valeur('interet_total'))} €",
+            format_taeg(graphe.valeur('taeg')),
+            f"{format_number_fr(graphe.valeur('taux_endettement'))} %"
+        ]
+    })
+    afficher_tableau(df_interactif, "Résultats")
+    st.caption(f"{len(recalcules)} grandeur(s) recalculée(s) en {format_number_fr(duree_recalcul)} ms")
+
+# Page 6 : Comparaison des offres de prêt pour le même projet
+elif st.session_state.page == "Comparaison des offres":
+    st.markdown("<h1 style='text-align: center;'>🏦 Comparaison des offres</h1>", unsafe_allow_html=True)
+
+    # Le projet est celui du plan de financement, à défaut le projet par défaut de la simulation interactive
+    if plan_complet():
+        projet = {nom: st.session_state[nom] for nom in NOMS_SAISIES}
+    else:
+        graphe = GrapheSimulation()
+        projet = {nom: graphe.valeur(nom) for nom in NOMS_SAISIES}
+        st.info("Plan de financement non complété : les offres sont comparées sur le projet par défaut.")
+    st.caption(f"Projet : bien de {format_number_fr(projet['valeur_bien'])} €, apport de "
+               f"{format_number_fr(projet['apport_personnel'])} €, revenu annuel de {format_number_fr(projet['revenu_annuel'])} €.")
+
+    # Offres types calculées sur le projet, recalculées lorsqu'il change (plan complété ou modifié) ;
+    # le tableau repart alors des offres saisies, les modifications de l'utilisateur étant conservées
+    if "offres_initiales" not in st.session_state:
+        st.session_state.offres_initiales = offres_exemple(projet)
+    elif st.session_state.projet_offres != projet:
+        st.session_state.offres_initiales = actualiser_offres_exemple(
+            st.session_state.get("offres_saisies", st.session_state.offres_initiales), st.session_state.projet_offres, projet)
+    st.session_state.projet_offres = projet
+    fragment_comparateur_offres(projet)
+
+# Page 7 : Consultation des résultats de lots et de stress tests enregistrés
+elif st.session_state.page == "Résultats enregistrés":
+    st.markdown("<h1 style='text-align: center;'>🗂️ Résultats enregistrés</h1>", unsafe_allow_html=True)
+
+    index_resultats = lister_resultats()
+    if index_resultats:
+        nom = st.selectbox("Résultats", list(index_resultats))
+        entree = index_resultats[nom]
+        st.caption(f"{entree['lignes']} lignes, enregistrés le {entree['date']}")
+
+        colonnes = st.multiselect("Colonnes", entree["colonnes"], default=entree["colonnes"])
+
+        # Lecture par pages : seules les lignes affichées sont chargées depuis le fichier
+        lignes_par_page = 1000
+        nombre_pages = max(1, -(-entree["lignes"] // lignes_par_page))
+        numero_page = st.number_input("Page", value=1, min_value=1, max_value=nombre_pages, step=1)
+        debut = (numero_page - 1) * lignes_par_page
+        st.dataframe(lire_resultats(nom, colonnes, debut, debut + lignes_par_page), hide_index=True)
+    else:
+        st.info("Aucun résultat enregistré. Lancez par exemple : python stress_test.py --enregistrer stress")
+
 # Ajouter un pied de page avec le logo
 st.markdown(
     f"""
@@ -907,3 +923,6 @@ st.markdown(
     """, 
     unsafe_allow_html=True
 )
+
+# Durée de la dernière exécution complète du script (en ms), mesurée comme celle des fragments
+st.session_state.duree_execution_complete = (time.perf_counter() - debut_execution) * 1000
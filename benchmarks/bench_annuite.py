@@ -0,0 +1,40 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy_financial as npf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from calculs_financement import calculer_financement, facteur_annuite, facteur_annuite_exact, table_facteurs_annuite
+from portefeuille import generer_portefeuille
+
+# Comparaison de la table des facteurs d'annuité avec npf.pmt pour les appels unitaires,
+# et de la formule fermée avec npf.pmt pour les tableaux de prêts
+
+
+def chronometrer(fonction, repetitions=1):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction()
+    return (time.perf_counter() - debut) / repetitions
+
+
+if __name__ == "__main__":
+    duree_construction = chronometrer(lambda: table_facteurs_annuite.__wrapped__())
+    print(f"Construction de la table : {duree_construction * 1000:.1f} ms")
+    table_facteurs_annuite()
+
+    # Appels unitaires, comme dans l'application interactive
+    duree_pmt = chronometrer(lambda: npf.pmt(0.035 / 12, 300, -200_000), 10_000)
+    duree_table = chronometrer(lambda: 200_000 * facteur_annuite(0.035, 300), 10_000)
+    print(f"Appel unitaire : npf.pmt {duree_pmt * 1e6:.1f} µs, table {duree_table * 1e6:.1f} µs, "
+          f"accélération x{duree_pmt / duree_table:.1f}")
+
+    # Portefeuille complet à travers les formules de la simulation
+    portefeuille = generer_portefeuille(1_000_000)
+    duree_simulation = chronometrer(lambda: calculer_financement(**portefeuille), 3)
+    duree_pmt = chronometrer(lambda: npf.pmt(portefeuille["taux_interet"] / 12, portefeuille["duree_pret_annees"] * 12, -1), 3)
+    duree_exacte = chronometrer(lambda: facteur_annuite_exact(portefeuille["taux_interet"], portefeuille["duree_pret_annees"] * 12), 3)
+    print(f"1 000 000 prêts : facteur npf.pmt {duree_pmt * 1000:.1f} ms, "
+          f"formule exacte {duree_exacte * 1000:.1f} ms, simulation complète (formule exacte) {duree_simulation * 1000:.1f} ms")
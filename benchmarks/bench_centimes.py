@@ -0,0 +1,57 @@
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from calculs_financement import calculer_financement_centimes, en_centimes
+from portefeuille import generer_portefeuille
+
+# Mode centimes : temps de calcul comparé à un déroulé en Decimal.
+# L'exactitude de l'échéancier est vérifiée par tests/test_calculs_financement.py
+
+CENTIME = Decimal("0.01")
+
+
+def portefeuille_centimes(nombre_prets):
+    portefeuille = generer_portefeuille(nombre_prets)
+    return {nom: valeur if nom == "taux_interet" else
+            valeur.astype(np.int64) if nom == "duree_pret_annees" else en_centimes(valeur)
+            for nom, valeur in portefeuille.items()}
+
+
+def total_interets_decimal(capital, taux_interet, duree_mois, mensualite):
+    """
+    Déroule l'échéancier d'un prêt en Decimal, pour comparaison.
+    """
+    capital_restant = Decimal(int(capital)) / 100
+    taux_annuel = Decimal(round(float(taux_interet) * 1_000_000)) / 1_000_000
+    mensualite = Decimal(int(mensualite)) / 100
+    total = Decimal(0)
+    for mois in range(1, int(duree_mois) + 1):
+        interets = (capital_restant * taux_annuel / 12).quantize(CENTIME, rounding=ROUND_HALF_UP)
+        paiement = capital_restant + interets if mois == duree_mois else mensualite
+        capital_restant -= paiement - interets
+        total += interets
+    return total
+
+
+if __name__ == "__main__":
+    portefeuille = portefeuille_centimes(1_000)
+    debut = time.perf_counter()
+    resultats = calculer_financement_centimes(**portefeuille)
+    duree_centimes = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    interets_decimal = [
+        total_interets_decimal(capital, taux, duree * 12, mensualite)
+        for capital, taux, duree, mensualite in zip(resultats["montant_total_finance"], portefeuille["taux_interet"],
+                                                   portefeuille["duree_pret_annees"], resultats["mensualite"])
+    ]
+    duree_decimal = time.perf_counter() - debut
+    identiques = all(en_centimes(float(valeur)) == centimes
+                     for valeur, centimes in zip(interets_decimal, resultats["interets_echeancier"]))
+    print(f"1000 prêts : centimes {duree_centimes * 1000:.1f} ms, Decimal {duree_decimal * 1000:.1f} ms, "
+          f"accélération x{duree_decimal / duree_centimes:.1f}, résultats identiques : {identiques}")
@@ -0,0 +1,34 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comparateur_offres import COLONNES_OFFRES, comparer_offres, offres_exemple
+from graphe_simulation import GrapheSimulation
+from resultats_simulation import NOMS_SAISIES, tableau_resultats
+
+# Comparaison de dix offres : évaluation vectorisée en une passe contre une simulation complète par offre
+
+
+def chronometrer(fonction, repetitions=200):
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        fonction()
+    return (time.perf_counter() - debut) / repetitions * 1000
+
+
+if __name__ == "__main__":
+    graphe = GrapheSimulation()
+    projet = {nom: graphe.valeur(nom) for nom in NOMS_SAISIES}
+    df_offres = pd.concat([offres_exemple(projet)] * 4, ignore_index=True).iloc[:10]
+
+    def une_simulation_par_offre():
+        for offre in df_offres.to_dict("records"):
+            tableau_resultats({**projet, **{nom: offre[nom] for nom in COLONNES_OFFRES[1:]}})
+
+    duree_boucle = chronometrer(une_simulation_par_offre)
+    duree_vectorisee = chronometrer(lambda: comparer_offres(projet, df_offres))
+    print(f"Une simulation par offre : {duree_boucle:7.2f} ms")
+    print(f"Passe vectorisée         : {duree_vectorisee:7.2f} ms, accélération x{duree_boucle / duree_vectorisee:.1f}")
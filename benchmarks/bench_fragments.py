@@ -0,0 +1,44 @@
+import os
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from charge_streamlit import RACINE, SessionSimulee
+
+# Gain des fragments : durée d'une réexécution complète du script comparée à celle du seul fragment
+# concerné, pour une interaction avec un widget du fragment. L'API de test réexécute toujours le script
+# entier : les deux durées sont lues dans la même exécution, avec le même chronomètre interne au script
+# (st.session_state.duree_execution_complete et st.session_state.durees_fragments).
+
+REPETITIONS = 10
+
+
+def mesurer(session, fragment, action):
+    durees_script, durees_fragment = [], []
+    for indice in range(REPETITIONS):
+        session.executer(lambda application: action(application, indice))
+        durees_script.append(session.application.session_state["duree_execution_complete"])
+        durees_fragment.append(session.application.session_state["durees_fragments"][fragment])
+    script, fragment_seul = statistics.median(durees_script), statistics.median(durees_fragment)
+    print(f"{fragment:<40} script complet {script:7.1f} ms, fragment {fragment_seul:7.1f} ms, "
+          f"réduction {1 - fragment_seul / script:6.1%}")
+
+
+if __name__ == "__main__":
+    # L'application charge son logo depuis le dossier courant
+    os.chdir(RACINE)
+    session = SessionSimulee(timeout=60)
+    session.executer()
+    session.aller_a("Plan de financement")
+    for etape in range(1, 14):
+        session.executer(lambda application: application.button(key=f"{etape}_valider").click())
+        session.executer()
+
+    # Téléchargement du PDF : le bouton appartient au fragment des résultats
+    mesurer(session, "fragment_resultats_simulation",
+            lambda application, indice: application.download_button[1].click())
+
+    session.aller_a("Mensualité souhaitée")
+    mesurer(session, "fragment_mensualite_souhaitee",
+            lambda application, indice: application.number_input(key="mensualite_souhaitee").set_value(900.0 + 10 * indice))
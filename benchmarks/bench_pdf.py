@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RACINE = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RACINE))
+import graphiques_pdf
+from calculs_financement import calculer_financement
+from rapport_pdf import creer_pdf
+
+# Temps de génération du rapport PDF avec graphiques, à froid puis avec les images en cache
+
+
+def generer_rapport():
+    resultats = {nom: float(valeur) for nom, valeur in calculer_financement(
+        60000, 200000, 30000, 0.035, 25, 595, 15000, 2550, 1360, 1700, 8000, 0, 0).items()}
+    df_resultats = pd.DataFrame({
+        "Description": list(resultats),
+        "Valeur": [f"{valeur:.2f} €" for valeur in resultats.values()],
+    })
+    graphiques = [
+        graphiques_pdf.graphique_comparaison_valeur_bien(resultats["mensualite_totale"], 200000),
+        graphiques_pdf.graphique_comparaison_taux_endettement(resultats["mensualite_totale"], 60000),
+        graphiques_pdf.graphique_amortissement(resultats["montant_total_finance"], 0.035, 25, resultats["mensualite"], 595),
+    ]
+    return creer_pdf(df_resultats, logo_path=str(RACINE / "1_Logo.png"), graphiques=graphiques)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as dossier:
+        graphiques_pdf.DOSSIER_GRAPHIQUES = Path(dossier)
+        for essai in ("à froid", "en cache", "en cache"):
+            debut = time.perf_counter()
+            pdf = generer_rapport()
+            duree = time.perf_counter() - debut
+            contenu = pdf.getvalue()
+            print(f"Rapport {essai} : {duree * 1000:.0f} ms, {contenu.count(b'/Type /Page') - 1} pages, "
+                  f"{len(contenu) / 1024:.0f} Ko, {len(os.listdir(dossier))} images en cache")
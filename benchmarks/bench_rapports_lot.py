@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rapports_lot import generer_rapports_lot, simulations_exemple
+
+# Débit de la génération par lots des rapports PDF en fonction du nombre de processus,
+# avec et sans graphiques. L'archive est écrite dans un dossier temporaire ; les graphiques
+# sont rendus par rapport dans des dossiers temporaires, sans toucher au cache de l'application.
+
+
+if __name__ == "__main__":
+    simulations = simulations_exemple(200)
+    nombres_processus = sorted({1, 2, 4, 8, os.cpu_count()})
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin_archive = Path(dossier) / "rapports.zip"
+        for nombre_processus in nombres_processus:
+            avec_graphiques = generer_rapports_lot(simulations, chemin_archive, nombre_processus=nombre_processus)
+            taille_archive = chemin_archive.stat().st_size / 1024 ** 2
+            sans_graphiques = generer_rapports_lot(simulations, chemin_archive, nombre_processus=nombre_processus,
+                                                   avec_graphiques=False)
+            print(f"{nombre_processus:>3} processus : {avec_graphiques['rapports_par_s']:6.1f} rapports/s avec graphiques "
+                  f"(archive de {taille_archive:.1f} Mo), {sans_graphiques['rapports_par_s']:6.1f} rapports/s sans")
@@ -0,0 +1,22 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from portefeuille import generer_portefeuille
+from stress_test import executer_stress_test
+
+# Mesure de la montée en charge du stress test en fonction du nombre de processus
+
+
+if __name__ == "__main__":
+    portefeuille = generer_portefeuille(1_000_000)
+    nombres_processus = sorted({1, 2, 4, 8, os.cpu_count()})
+    duree_reference = None
+    for nombre_processus in nombres_processus:
+        debut = time.perf_counter()
+        executer_stress_test(portefeuille, nombre_processus=nombre_processus)
+        duree = time.perf_counter() - debut
+        duree_reference = duree_reference or duree
+        print(f"{nombre_processus:>3} processus : {duree:6.2f} s, accélération x{duree_reference / duree:5.2f}")
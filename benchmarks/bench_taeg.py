@@ -0,0 +1,41 @@
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import numpy_financial as npf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from calculs_financement import calculer_taeg, calculer_taeg_scalaire
+
+# Comparaison du solveur TAEG vectorisé avec le calcul prêt par prêt (npf.rate)
+
+
+def generer_portefeuille(nombre_prets, graine=0):
+    """
+    Génère un portefeuille de prêts aléatoires : capital net, mensualité totale et durée en mois.
+    """
+    rng = np.random.default_rng(graine)
+    capital = rng.uniform(50_000, 500_000, nombre_prets)
+    taux_mensuel = rng.uniform(0.005, 0.06, nombre_prets) / 12
+    duree_mois = rng.integers(5, 31, nombre_prets) * 12
+    # Les frais et l'assurance majorent la mensualité par rapport au capital net
+    mensualite_totale = npf.pmt(taux_mensuel, duree_mois, -capital) * rng.uniform(1.0, 1.1, nombre_prets)
+    return capital, mensualite_totale, duree_mois
+
+
+def chronometrer(fonction, *args):
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return resultat, time.perf_counter() - debut
+
+
+if __name__ == "__main__":
+    for nombre_prets in (1_000, 10_000):
+        portefeuille = generer_portefeuille(nombre_prets)
+        taeg_vectorise, duree_vectorise = chronometrer(calculer_taeg, *portefeuille)
+        taeg_scalaire, duree_scalaire = chronometrer(calculer_taeg_scalaire, *portefeuille)
+        ecart_max = np.nanmax(np.abs(taeg_vectorise - taeg_scalaire))
+        print(f"{nombre_prets:>7} prêts : vectorisé {duree_vectorise * 1000:8.1f} ms, "
+              f"scalaire {duree_scalaire * 1000:9.1f} ms, "
+              f"accélération x{duree_scalaire / duree_vectorise:6.1f}, écart max {ecart_max:.2e}")
@@ -0,0 +1,198 @@
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from streamlit.runtime.scriptrunner import script_cache
+from streamlit.testing.v1 import AppTest
+
+# Test de charge de l'application : N sessions simulées parcourent en parallèle toutes les pages,
+# comme les sessions d'un même processus serveur Streamlit.
+
+RACINE = Path(__file__).resolve().parent.parent
+SCRIPT_APPLICATION = RACINE / "Web_App_Simulation_Financement_Immobilier_nov_2024.py"
+DOSSIER_RAPPORTS = Path(__file__).resolve().parent / "rapports_charge"
+
+
+@contextlib.contextmanager
+def compilation_serialisee():
+    """
+    Le serveur compile le script une seule fois pour toutes les sessions, alors que chaque AppTest
+    a son propre cache : pendant le test de charge, la compilation est sérialisée, ast.parse n'étant
+    pas sûr entre threads en 3.11. La méthode interne de Streamlit est rétablie à la sortie.
+    """
+    verrou = threading.Lock()
+    lire_bytecode = script_cache.ScriptCache.get_bytecode
+
+    def lire_bytecode_verrouille(self, script_path):
+        with verrou:
+            return lire_bytecode(self, script_path)
+
+    script_cache.ScriptCache.get_bytecode = lire_bytecode_verrouille
+    try:
+        yield
+    finally:
+        script_cache.ScriptCache.get_bytecode = lire_bytecode
+
+
+def memoire_residente_mo():
+    """
+    Retourne la mémoire résidente actuelle du processus en Mo (Linux), à défaut le pic de mémoire
+    (autres Unix), None si aucune mesure n'est disponible (Windows).
+    """
+    try:
+        with open("/proc/self/statm") as fichier:
+            return int(fichier.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except OSError:
+        pass
+    try:
+        # Module propre aux Unix : importé ici pour que le test de charge s'importe aussi sous Windows
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class SessionSimulee:
+    """
+    Une session utilisateur pilotée par l'API de test de Streamlit, chaque réexécution étant chronométrée.
+    """
+
+    def __init__(self, timeout):
+        self.application = AppTest.from_file(str(SCRIPT_APPLICATION), default_timeout=timeout)
+        self.latences = []
+
+    def executer(self, action=None):
+        debut = time.perf_counter()
+        if action is not None:
+            action(self.application)
+        self.application.run()
+        self.latences.append((time.perf_counter() - debut) * 1000)
+        if self.application.exception:
+            raise RuntimeError(self.application.exception[0].value)
+
+    def aller_a(self, page):
+        self.executer(lambda application: application.sidebar.selectbox[0].select(page))
+
+    def parcourir(self):
+        self.executer()
+
+        # Plan de financement : validation des 13 étapes avec les valeurs proposées
+        self.aller_a("Plan de financement")
+        for etape in range(1, 14):
+            self.executer(lambda application: application.button(key=f"{etape}_valider").click())
+            # La validation change l'étape une fois la page affichée : dans le navigateur comme ici,
+            # l'étape suivante n'apparaît qu'à la réexécution suivante, visible par l'utilisateur
+            self.executer()
+
+        self.aller_a("Mensualité souhaitée")
+        for mensualite in (900.0, 1100.0, 1300.0):
+            self.executer(lambda application: application.number_input[0].set_value(mensualite))
+
+        self.aller_a("Comparaison des mensualités")
+
+        self.aller_a("Simulation interactive")
+        for valeur_bien in (180000.0, 220000.0, 260000.0):
+            self.executer(lambda application: application.slider(key="interactif_valeur_bien").set_value(valeur_bien))
+
+        self.aller_a("Comparaison des offres")
+        for critere in ("Mensualité avec assurance", "Taux d'endettement", "Coût total du crédit"):
+            self.executer(lambda application: application.radio(key="critere_offres").set_value(critere))
+
+        self.aller_a("Résultats enregistrés")
+        self.aller_a("Présentation")
+
+
+def percentile(valeurs, rang):
+    return statistics.quantiles(valeurs, n=100, method="inclusive")[rang - 1] if len(valeurs) > 1 else valeurs[0]
+
+
+def version_application():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=RACINE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnue"
+
+
+def executer_test_charge(nombre_sessions, timeout=60):
+    """
+    Lance nombre_sessions sessions simultanées et retourne le rapport de latence, de CPU et de mémoire.
+    """
+    memoire_initiale = memoire_residente_mo()
+    # Les sessions sont créées à l'avance pour ne mesurer que les parcours
+    sessions = [SessionSimulee(timeout) for _ in range(nombre_sessions)]
+    depart = threading.Barrier(nombre_sessions)
+
+    def parcourir(session):
+        depart.wait()
+        session.parcourir()
+
+    cpu_initial = time.process_time()
+    debut = time.perf_counter()
+    with compilation_serialisee(), ThreadPoolExecutor(max_workers=nombre_sessions) as executeur:
+        list(executeur.map(parcourir, sessions))
+    duree = time.perf_counter() - debut
+    cpu = time.process_time() - cpu_initial
+    memoire_finale = memoire_residente_mo()
+
+    latences = [latence for session in sessions for latence in session.latences]
+    return {
+        "version": version_application(),
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "sessions": nombre_sessions,
+        "reexecutions": len(latences),
+        "duree_s": round(duree, 3),
+        "reexecutions_par_s": round(len(latences) / duree, 1),
+        "latence_ms": {
+            "p50": round(percentile(latences, 50), 1),
+            "p90": round(percentile(latences, 90), 1),
+            "p95": round(percentile(latences, 95), 1),
+            "p99": round(percentile(latences, 99), 1),
+            "max": round(max(latences), 1),
+        },
+        "cpu_s": round(cpu, 3),
+        "cpu_ms_par_reexecution": round(cpu / len(latences) * 1000, 2),
+        "memoire_mo": None if None in (memoire_initiale, memoire_finale) else {
+            "initiale": round(memoire_initiale, 1),
+            "finale": round(memoire_finale, 1),
+            "croissance": round(memoire_finale - memoire_initiale, 1),
+        },
+    }
+
+
+def comparer_au_rapport_precedent(rapport):
+    """
+    Affiche l'évolution de la latence p95 par rapport au dernier rapport enregistré pour le même nombre de sessions.
+    """
+    precedents = sorted(DOSSIER_RAPPORTS.glob(f"charge_{rapport['sessions']}_sessions_*.json"))
+    if not precedents:
+        return
+    with open(precedents[-1], encoding="utf-8") as fichier:
+        precedent = json.load(fichier)
+    evolution = rapport["latence_ms"]["p95"] / precedent["latence_ms"]["p95"] - 1
+    print(f"p95 : {precedent['latence_ms']['p95']} ms ({precedent['version']}) -> "
+          f"{rapport['latence_ms']['p95']} ms ({rapport['version']}), {evolution:+.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test de charge de l'application Streamlit")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10], help="Nombres de sessions simultanées")
+    arguments = parser.parse_args()
+
+    # L'application charge son logo depuis le dossier courant
+    os.chdir(RACINE)
+    DOSSIER_RAPPORTS.mkdir(exist_ok=True)
+    for nombre_sessions in arguments.sessions:
+        rapport = executer_test_charge(nombre_sessions)
+        print(json.dumps(rapport, ensure_ascii=False, indent=2))
+        comparer_au_rapport_precedent(rapport)
+        chemin = DOSSIER_RAPPORTS / f"charge_{nombre_sessions}_sessions_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, ensure_ascii=False, indent=2)
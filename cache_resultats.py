@@ -0,0 +1,111 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Cache des résultats de lots et de stress tests au format colonne Arrow (Feather v2 non compressé).
+# Les fichiers sont ouverts en projection mémoire : seules les colonnes et les lignes lues sont chargées.
+
+DOSSIER_CACHE = Path(__file__).resolve().parent / "cache_resultats"
+FICHIER_INDEX = "index.json"
+# Verrou des écrivains de l'index : au-delà de ce délai, un verrou est considéré comme abandonné
+DELAI_VERROU_S = 10.0
+
+
+def _lire_index(dossier):
+    chemin_index = Path(dossier) / FICHIER_INDEX
+    if not chemin_index.exists():
+        return {}
+    with open(chemin_index, encoding="utf-8") as fichier:
+        return json.load(fichier)
+
+
+@contextmanager
+def _verrouiller_index(dossier):
+    """
+    Réserve la mise à jour de l'index à un seul écrivain à la fois, processus compris :
+    sans verrou, deux enregistrements simultanés relisent le même index et le dernier écrit
+    efface l'entrée de l'autre. Le verrou est un fichier créé en exclusivité, portable sous Windows.
+    """
+    chemin_verrou = Path(dossier) / f"{FICHIER_INDEX}.verrou"
+    while True:
+        try:
+            descripteur = os.open(chemin_verrou, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                # Verrou laissé par un processus interrompu
+                if time.time() - chemin_verrou.stat().st_mtime > DELAI_VERROU_S:
+                    chemin_verrou.unlink(missing_ok=True)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.01)
+    try:
+        yield
+    finally:
+        os.close(descripteur)
+        chemin_verrou.unlink(missing_ok=True)
+
+
+def enregistrer_resultats(df, nom, metadonnees=None, dossier=DOSSIER_CACHE):
+    """
+    Enregistre un DataFrame de résultats sous le nom donné et met à jour l'index des résultats.
+    Le fichier n'est pas compressé pour pouvoir être relu sans copie.
+    """
+    dossier = Path(dossier)
+    dossier.mkdir(parents=True, exist_ok=True)
+    fichier = f"{nom}.arrow"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # Écriture dans un fichier temporaire puis renommage, pour ne jamais exposer un fichier partiel
+    chemin_temporaire = dossier / f"{fichier}.tmp"
+    feather.write_feather(table, chemin_temporaire, compression="uncompressed")
+    chemin_temporaire.replace(dossier / fichier)
+
+    with _verrouiller_index(dossier):
+        index = _lire_index(dossier)
+        index[nom] = {
+            "fichier": fichier,
+            "lignes": table.num_rows,
+            "colonnes": table.column_names,
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "metadonnees": metadonnees or {},
+        }
+        # Même principe que pour les données : un lecteur voit l'ancien ou le nouvel index, jamais un index tronqué
+        chemin_temporaire = dossier / f"{FICHIER_INDEX}.tmp"
+        with open(chemin_temporaire, "w", encoding="utf-8") as fichier_index:
+            json.dump(index, fichier_index, ensure_ascii=False, indent=2)
+        chemin_temporaire.replace(dossier / FICHIER_INDEX)
+
+
+def lister_resultats(dossier=DOSSIER_CACHE):
+    """
+    Retourne l'index des résultats enregistrés : nom, nombre de lignes, colonnes, date et métadonnées.
+    """
+    return _lire_index(dossier)
+
+
+def ouvrir_resultats(nom, dossier=DOSSIER_CACHE):
+    """
+    Ouvre des résultats enregistrés en projection mémoire et retourne une table Arrow
+    dont les colonnes pointent directement dans le fichier.
+    """
+    entree = _lire_index(dossier)[nom]
+    source = pa.memory_map(str(Path(dossier) / entree["fichier"]), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def lire_resultats(nom, colonnes=None, debut=0, fin=None, dossier=DOSSIER_CACHE):
+    """
+    Lit une plage de lignes [debut, fin) et une sélection de colonnes des résultats enregistrés.
+    Seule la partie demandée est convertie en DataFrame.
+    """
+    table = ouvrir_resultats(nom, dossier)
+    if colonnes is not None:
+        table = table.select(colonnes)
+    fin = table.num_rows if fin is None else min(fin, table.num_rows)
+    return table.slice(debut, max(fin - debut, 0)).to_pandas()
@@ -0,0 +1,336 @@
+from functools import lru_cache
+
+import numpy as np
+import numpy_financial as npf
+
+# Calculs financiers vectorisés, sans dépendance à Streamlit, pour pouvoir
+# être utilisés par l'application comme par les traitements par lots.
+
+# Taux d'endettement maximal recommandé (en %)
+SEUIL_ENDETTEMENT = 35.0
+
+
+def calculer_taeg(capital_net, mensualite_totale, duree_mois, tolerance=1e-12, max_iterations=100):
+    """
+    Calcule le TAEG (taux annuel effectif global) d'un tableau de prêts en une seule passe.
+    Le taux mensuel actuariel r vérifie : mensualite_totale * (1 - (1 + r)^-n) / r = capital_net.
+    Résolution par la méthode de Newton, sécurisée par une bissection sur un encadrement
+    [0, mensualite_totale / capital_net] qui converge pour tous les prêts simultanément.
+    Des mensualités arrondies au centime peuvent rembourser jusqu'à un demi-centime par échéance
+    de moins que le capital à taux nul : ce cas est traité explicitement et donne un TAEG nul.
+    Retourne le TAEG en décimal (0.035 pour 3,5 %), NaN lorsque le capital net est nul ou négatif
+    ou que les remboursements restent inférieurs au capital au-delà de cet arrondi.
+    """
+    capital_net, mensualite_totale, duree_mois = np.broadcast_arrays(
+        np.asarray(capital_net, dtype=float),
+        np.asarray(mensualite_totale, dtype=float),
+        np.asarray(duree_mois, dtype=float),
+    )
+    valide = (capital_net > 0) & (duree_mois > 0) & (mensualite_totale * duree_mois >= capital_net)
+    # Racine nulle : remboursements sous le capital du seul fait de l'arrondi des mensualités
+    deficit = capital_net - mensualite_totale * duree_mois
+    sans_interet = (capital_net > 0) & (duree_mois > 0) & (deficit > 0) & (deficit <= 0.005 * duree_mois + 1e-9)
+
+    # Encadrement de la racine : la valeur actuelle est décroissante en r
+    borne_basse = np.zeros(capital_net.shape)
+    borne_haute = np.where(valide, mensualite_totale / np.where(valide, capital_net, 1.0), 0.0)
+    taux = np.where(valide, borne_haute / 2, 0.01)
+
+    for _ in range(max_iterations):
+        actualisation = np.exp(-duree_mois * np.log1p(taux))  # (1 + r)^-n
+        facteur = -np.expm1(-duree_mois * np.log1p(taux)) / taux
+        ecart = mensualite_totale * facteur - capital_net
+        derivee = mensualite_totale * (duree_mois * actualisation / (1 + taux) - facteur) / taux
+        derivee = np.where(derivee < 0, derivee, -np.inf)
+
+        # Resserrer l'encadrement puis tenter un pas de Newton
+        borne_basse = np.where(ecart > 0, taux, borne_basse)
+        borne_haute = np.where(ecart > 0, borne_haute, taux)
+        taux_newton = taux - ecart / derivee
+        hors_encadrement = ~((taux_newton > borne_basse) & (taux_newton < borne_haute))
+        nouveau_taux = np.where(hors_encadrement, (borne_basse + borne_haute) / 2, taux_newton)
+
+        converge = ~valide | (np.abs(nouveau_taux - taux) <= tolerance)
+        taux = np.where(valide, nouveau_taux, taux)
+        if converge.all():
+            break
+
+    taeg = np.expm1(12 * np.log1p(taux))
+    return np.where(valide, taeg, np.where(sans_interet, 0.0, np.nan))
+
+
+def calculer_taeg_scalaire(capital_net, mensualite_totale, duree_mois):
+    """
+    Calcule le TAEG prêt par prêt avec npf.rate. Sert de référence pour les comparaisons.
+    """
+    resultats = []
+    for capital, mensualite, duree in zip(np.ravel(capital_net), np.ravel(mensualite_totale), np.ravel(duree_mois)):
+        taux_mensuel = npf.rate(duree, -mensualite, capital, 0)
+        resultats.append((1 + taux_mensuel) ** 12 - 1)
+    return np.array(resultats)
+
+
+def taeg_depuis_simulation(montant_total_finance, mensualite, assurance_annuelle, duree_pret_annees,
+                           frais_de_dossier, frais_de_garantie, frais_de_courtage):
+    """
+    Calcule le TAEG à partir des données de la simulation.
+    Convention : comme dans le montant total financé, l'assurance de toute la durée est financée par le prêt,
+    au même titre que les frais de dossier, de garantie et de courtage. Ces montants ne sont pas versés
+    à l'emprunteur : ils sont déduits du capital réellement mis à disposition, et leur remboursement
+    est compris dans la mensualité hors assurance. L'assurance n'est donc comptée qu'une fois,
+    sans ajouter l'assurance mensuelle aux remboursements.
+    """
+    assurance_annuelle = np.asarray(assurance_annuelle, dtype=float)
+    duree_pret_annees = np.asarray(duree_pret_annees, dtype=float)
+    capital_net = (np.asarray(montant_total_finance, dtype=float) - frais_de_dossier - frais_de_garantie
+                   - frais_de_courtage - assurance_annuelle * duree_pret_annees)
+    return calculer_taeg(capital_net, mensualite, duree_pret_annees * 12)
+
+
+# Table des facteurs d'annuité : mensualité pour 1 € emprunté, par taux annuel en points de base
+# (0 à 1500, soit 0 à 15 %) et par durée en mois (12 à 480). Construite une fois par processus.
+# Les curseurs de la simulation interactive avancent par point de base entier : en dessous de 15 %,
+# chaque position est lue directement dans la table. Les taux plus élevés acceptés par le plan
+# de financement (jusqu'à 100 %) passent par la formule.
+TAUX_MAX_POINTS_BASE = 1500
+DUREE_MIN_MOIS = 12
+DUREE_MAX_MOIS = 480
+
+
+def _construire_table_facteurs():
+    taux_mensuel = np.arange(TAUX_MAX_POINTS_BASE + 1)[:, None] / 10_000 / 12
+    duree_mois = np.arange(DUREE_MIN_MOIS, DUREE_MAX_MOIS + 1)[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        facteurs = taux_mensuel / -np.expm1(-duree_mois * np.log1p(taux_mensuel))
+    facteurs[0, :] = 1 / duree_mois[0]
+    return facteurs
+
+
+@lru_cache(maxsize=None)
+def table_facteurs_annuite():
+    """
+    Retourne la table des facteurs d'annuité (environ 5,6 Mo).
+    """
+    return _construire_table_facteurs()
+
+
+def facteur_annuite_exact(taux_interet, duree_mois):
+    """
+    Retourne la mensualité pour 1 € emprunté par la formule fermée, taux nul compris (1 / durée).
+    Utilisée pour les tableaux de prêts, où la table n'apporte pas de gain : le calcul reste exact.
+    """
+    taux_mensuel = np.asarray(taux_interet, dtype=float) / 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(taux_mensuel != 0, taux_mensuel / -np.expm1(-duree_mois * np.log1p(taux_mensuel)), 1 / duree_mois)
+
+
+def facteur_annuite(taux_interet, duree_mois):
+    """
+    Retourne la mensualité pour 1 € emprunté, soit le facteur de la formule de npf.pmt, pour un seul prêt
+    (appels unitaires de l'application interactive). Lecture directe dans la table pour un taux
+    en points de base entiers et une durée entière en mois couverts par la table ; formule sinon.
+    """
+    points_base = float(taux_interet) * 10_000
+    indice_taux = round(points_base)
+    # La table est indexée par mois entiers : une durée fractionnaire n'est pas tronquée
+    if (abs(points_base - indice_taux) < 1e-6 and 0 <= indice_taux <= TAUX_MAX_POINTS_BASE
+            and DUREE_MIN_MOIS <= duree_mois <= DUREE_MAX_MOIS and float(duree_mois).is_integer()):
+        return table_facteurs_annuite().item(indice_taux, int(duree_mois) - DUREE_MIN_MOIS)
+    return float(facteur_annuite_exact(taux_interet, duree_mois))
+
+
+def calculer_financement(revenu_annuel, valeur_bien, apport, taux_interet, duree_pret_annees,
+                         assurance_annuelle, frais_notaire, frais_garantie, frais_dossier,
+                         frais_courtage, frais_agence, ptz, pel):
+    """
+    Applique les formules de la simulation de financement à des scalaires ou à des tableaux de prêts.
+    Le taux d'intérêt est exprimé en décimal (0.035 pour 3,5 %).
+    Le PTZ et le PEL ne financent que le besoin : s'ils le dépassent, le montant total financé est nul.
+    Retourne un dictionnaire des grandeurs calculées, arrondies au centime comme dans l'application.
+    """
+    taux_interet = np.asarray(taux_interet, dtype=float)
+    duree_pret_annees = np.asarray(duree_pret_annees)
+    assurance_annuelle = np.asarray(assurance_annuelle, dtype=float)
+
+    montant_pret = np.asarray(valeur_bien, dtype=float) - apport
+    cout_total_frais = np.round(frais_notaire + frais_garantie + frais_dossier + frais_courtage + frais_agence + assurance_annuelle * duree_pret_annees, 2)
+    montant_total_finance = np.maximum(np.round(montant_pret + cout_total_frais - ptz - pel, 2), 0.0)
+
+    duree_pret_mois = duree_pret_annees * 12
+    assurance_mensuelle = np.round(assurance_annuelle / 12, 2)
+
+    # Formule fermée plutôt que la table : sur des tableaux, elle est aussi rapide et sans interpolation
+    mensualite = np.round(montant_total_finance * facteur_annuite_exact(taux_interet, duree_pret_mois), 2)
+
+    mensualite_totale = np.round(mensualite + assurance_mensuelle, 2)
+    paiement_total = np.round((mensualite * duree_pret_mois) + assurance_annuelle * duree_pret_annees, 2)
+    interet_total = np.round(paiement_total - montant_pret, 2)
+    revenu_mensuel = np.round(np.asarray(revenu_annuel, dtype=float) / 12, 2)
+    taux_endettement = np.round((mensualite_totale / revenu_mensuel) * 100, 2)
+
+    return {
+        "montant_pret": montant_pret,
+        "cout_total_frais": cout_total_frais,
+        "montant_total_finance": montant_total_finance,
+        "assurance_mensuelle": assurance_mensuelle,
+        "mensualite": mensualite,
+        "mensualite_totale": mensualite_totale,
+        "paiement_total": paiement_total,
+        "interet_total": interet_total,
+        "revenu_mensuel": revenu_mensuel,
+        "taux_endettement": taux_endettement,
+    }
+
+
+# Mode exact : montants en centimes entiers (int64).
+# Règle d'arrondi : au centime le plus proche, la moitié étant arrondie en s'éloignant de zéro.
+
+def en_centimes(montant):
+    """
+    Convertit un montant en euros (scalaire ou tableau) en centimes entiers selon la règle d'arrondi.
+    Le produit par 100 est d'abord ramené à six décimales : 1,005 € vaut 100,49999999999999 en flottant
+    et doit pourtant être arrondi à 101 centimes comme le montant décimal saisi.
+    """
+    montant = np.round(np.asarray(montant, dtype=float) * 100, 6)
+    return (np.sign(montant) * np.floor(np.abs(montant) + 0.5)).astype(np.int64)
+
+
+def en_euros(centimes):
+    """
+    Convertit des centimes entiers en euros pour l'affichage.
+    """
+    return np.asarray(centimes, dtype=np.int64) / 100
+
+
+def diviser_centimes(centimes, diviseur):
+    """
+    Divise des centimes entiers par un entier avec la règle d'arrondi, sans passer par les flottants.
+    """
+    centimes = np.asarray(centimes, dtype=np.int64)
+    return np.sign(centimes) * ((2 * np.abs(centimes) + diviseur) // (2 * diviseur))
+
+
+def _amortir_centimes(capital, taux_annuel, duree_mois, mensualite, assurance_annuelle, conserver_echeancier=False):
+    """
+    Déroule l'échéancier mois par mois, vectorisé sur l'ensemble des prêts.
+    Les intérêts de chaque mois sont calculés en entiers, le taux annuel étant exprimé en millionièmes,
+    puis arrondis au centime ; la dernière échéance solde le capital restant.
+    L'assurance mensuelle est arrondie au centime, le dernier mois de chaque année absorbant l'écart
+    pour que chaque année corresponde exactement à la prime annuelle.
+    """
+    capital_restant = np.array(capital, dtype=np.int64)
+    taux_annuel_millioniemes = np.rint(np.asarray(taux_annuel, dtype=float) * 1_000_000).astype(np.int64)
+    nombre_mois = int(duree_mois.max(initial=0))
+    assurance_mensuelle = diviser_centimes(assurance_annuelle, 12)
+    total_mensualites = np.zeros_like(capital_restant)
+    total_interets = np.zeros_like(capital_restant)
+    total_assurance = np.zeros_like(capital_restant)
+    derniere_mensualite = np.zeros_like(capital_restant)
+    echeancier = {nom: np.zeros(capital_restant.shape + (nombre_mois,), dtype=np.int64)
+                  for nom in ("mensualite", "interets", "capital", "assurance", "capital_restant")} if conserver_echeancier else None
+
+    for mois in range(1, nombre_mois + 1):
+        actif = mois <= duree_mois
+        interets = np.where(actif, diviser_centimes(capital_restant * taux_annuel_millioniemes, 12 * 1_000_000), 0)
+        dernier_mois = mois == duree_mois
+        paiement = np.where(dernier_mois, capital_restant + interets, np.where(actif, mensualite, 0))
+        amortissement = paiement - interets
+        assurance = np.where(mois % 12 == 0, assurance_annuelle - 11 * assurance_mensuelle, assurance_mensuelle)
+        assurance = np.where(actif, assurance, 0)
+
+        capital_restant = capital_restant - amortissement
+        total_mensualites += paiement
+        total_interets += interets
+        total_assurance += assurance
+        derniere_mensualite = np.where(dernier_mois, paiement, derniere_mensualite)
+        if conserver_echeancier:
+            echeancier["mensualite"][..., mois - 1] = paiement
+            echeancier["interets"][..., mois - 1] = interets
+            echeancier["capital"][..., mois - 1] = amortissement
+            echeancier["assurance"][..., mois - 1] = assurance
+            echeancier["capital_restant"][..., mois - 1] = capital_restant
+
+    totaux = {
+        "total_mensualites": total_mensualites,
+        "total_interets": total_interets,
+        "total_assurance": total_assurance,
+        "derniere_mensualite": derniere_mensualite,
+    }
+    return totaux, echeancier
+
+
+def calculer_financement_centimes(revenu_annuel, valeur_bien, apport, taux_interet, duree_pret_annees,
+                                  assurance_annuelle, frais_notaire, frais_garantie, frais_dossier,
+                                  frais_courtage, frais_agence, ptz, pel):
+    """
+    Variante exacte de calculer_financement : les montants sont des centimes entiers (int64)
+    et le taux d'intérêt est en décimal. Seule la mensualité théorique passe par la formule flottante,
+    arrondie une seule fois au centime. Les totaux sont les sommes exactes de l'échéancier,
+    dont la dernière échéance est ajustée pour solder le capital. Comme dans calculer_financement,
+    le montant total financé est ramené à zéro lorsque le PTZ et le PEL dépassent le besoin.
+    """
+    taux_interet = np.asarray(taux_interet, dtype=float)
+    duree_pret_annees = np.asarray(duree_pret_annees, dtype=np.int64)
+    assurance_annuelle = np.asarray(assurance_annuelle, dtype=np.int64)
+
+    montant_pret = np.asarray(valeur_bien, dtype=np.int64) - apport
+    cout_total_frais = frais_notaire + frais_garantie + frais_dossier + frais_courtage + frais_agence + assurance_annuelle * duree_pret_annees
+    montant_total_finance = np.maximum(montant_pret + cout_total_frais - ptz - pel, 0)
+
+    duree_pret_mois = duree_pret_annees * 12
+    assurance_mensuelle = diviser_centimes(assurance_annuelle, 12)
+
+    mensualite = en_centimes(montant_total_finance / 100 * facteur_annuite_exact(taux_interet, duree_pret_mois))
+    totaux, _ = _amortir_centimes(montant_total_finance, taux_interet, duree_pret_mois, mensualite, assurance_annuelle)
+
+    mensualite_totale = mensualite + assurance_mensuelle
+    paiement_total = totaux["total_mensualites"] + totaux["total_assurance"]
+    interet_total = paiement_total - montant_pret
+    revenu_mensuel = diviser_centimes(revenu_annuel, 12)
+    taux_endettement = np.round(mensualite_totale / revenu_mensuel * 100, 2)
+
+    return {
+        "montant_pret": montant_pret,
+        "cout_total_frais": cout_total_frais,
+        "montant_total_finance": montant_total_finance,
+        "assurance_mensuelle": assurance_mensuelle,
+        "mensualite": mensualite,
+        "mensualite_totale": mensualite_totale,
+        "derniere_mensualite": totaux["derniere_mensualite"],
+        "paiement_total": paiement_total,
+        "interet_total": interet_total,
+        "interets_echeancier": totaux["total_interets"],
+        "revenu_mensuel": revenu_mensuel,
+        "taux_endettement": taux_endettement,
+    }
+
+
+def tableau_amortissement_centimes(montant_total_finance, taux_interet, duree_pret_annees, mensualite, assurance_annuelle):
+    """
+    Retourne l'échéancier détaillé en centimes (mensualité, intérêts, capital, assurance, capital restant),
+    un tableau par grandeur, le dernier axe correspondant aux mois.
+    """
+    duree_pret_mois = np.asarray(duree_pret_annees, dtype=np.int64) * 12
+    _, echeancier = _amortir_centimes(montant_total_finance, taux_interet, duree_pret_mois,
+                                      np.asarray(mensualite, dtype=np.int64), np.asarray(assurance_annuelle, dtype=np.int64),
+                                      conserver_echeancier=True)
+    return echeancier
+
+
+def comparer_mensualites_valeur_bien(mensualite_actuelle, valeur_bien_actuelle):
+    """
+    Mensualités croissantes et décroissantes avec un écart de 20 € et valeur du bien correspondante (règle de trois).
+    """
+    mensualites = [mensualite_actuelle + i * 20 for i in range(-10, 11)]
+    valeurs_bien = [round((mensualite / mensualite_actuelle) * valeur_bien_actuelle, 2) for mensualite in mensualites]
+    return mensualites, valeurs_bien
+
+
+def comparer_mensualites_taux_endettement(mensualite_actuelle, revenu_annuel):
+    """
+    Mensualités croissantes et décroissantes avec un écart de 20 € et taux d'endettement correspondant.
+    """
+    mensualites = [mensualite_actuelle + i * 20 for i in range(-10, 11)]
+    revenu_mensuel = revenu_annuel / 12
+    taux_endettements = [round((mensualite / revenu_mensuel) * 100, 2) for mensualite in mensualites]
+    return mensualites, taux_endettements
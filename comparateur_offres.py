@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from calculs_financement import SEUIL_ENDETTEMENT, calculer_financement, taeg_depuis_simulation
+
+# Comparaison d'offres de prêt pour un même projet : toutes les offres passent ensemble,
+# en une seule évaluation vectorisée, dans les formules de la simulation.
+
+# Saisies propres à chaque offre, les autres saisies du plan de financement décrivent le projet
+COLONNES_OFFRES = [
+    "banque", "taux_interet", "duree_pret", "assurance_emprunteur_annuelle",
+    "frais_de_dossier", "frais_de_garantie", "frais_de_courtage",
+]
+
+# Critères de classement : colonne du comparatif, la plus petite valeur étant la meilleure
+CRITERES_CLASSEMENT = {
+    "Coût total du crédit": "cout_credit",
+    "Mensualité avec assurance": "mensualite_totale",
+    "Taux d'endettement": "taux_endettement",
+}
+
+
+def offres_exemple(projet):
+    """
+    Retourne trois offres types pour le projet, avec les taux de frais par défaut du plan de financement.
+    """
+    montant_pret = projet["valeur_bien"] - projet["apport_personnel"]
+    offres = [
+        ("Banque A", 3.5, 25, 0.0035, 0.008, 0.015, 0.01),
+        ("Banque B", 3.3, 25, 0.0040, 0.010, 0.015, 0.0),
+        ("Banque C", 3.2, 20, 0.0030, 0.005, 0.012, 0.01),
+    ]
+    return pd.DataFrame([
+        [banque, taux, duree, *(round(part * montant_pret, 2) for part in parts)]
+        for banque, taux, duree, *parts in offres
+    ], columns=COLONNES_OFFRES)
+
+
+def actualiser_offres_exemple(df_offres, ancien_projet, projet):
+    """
+    Adapte le tableau des offres à un nouveau projet : les offres types restées telles que générées
+    pour l'ancien projet reprennent des frais calculés sur le nouveau, les offres saisies
+    ou modifiées par l'utilisateur sont conservées.
+    """
+    anciennes_offres = offres_exemple(ancien_projet).set_index("banque")
+    nouvelles_offres = offres_exemple(projet).set_index("banque")
+    df_offres = df_offres.reset_index(drop=True).copy()
+    for indice, offre in df_offres.iterrows():
+        banque = offre["banque"]
+        if banque in anciennes_offres.index and all(
+                offre[nom] == anciennes_offres.at[banque, nom] for nom in COLONNES_OFFRES[1:]):
+            df_offres.loc[indice, COLONNES_OFFRES[1:]] = nouvelles_offres.loc[banque, COLONNES_OFFRES[1:]].to_numpy()
+    return df_offres
+
+
+def comparer_offres(projet, df_offres):
+    """
+    Évalue toutes les offres du tableau sur le même projet (taux d'intérêt en %) et les classe
+    selon chaque critère. Le coût total du crédit est la somme des mensualités moins le capital
+    réellement mis à disposition : intérêts, assurance et frais de dossier, de garantie et de courtage,
+    l'assurance financée étant comptée une seule fois, comme dans le TAEG.
+    Les offres incomplètes (taux ou durée manquants) sont ignorées.
+    """
+    # Colonnes extraites une fois en tableaux numpy : le DataFrame n'est reconstruit qu'à la fin,
+    # les insertions de colonnes une à une coûtant plus cher que le calcul lui-même
+    offres = {nom: df_offres[nom].to_numpy(dtype=float, na_value=np.nan) for nom in COLONNES_OFFRES[1:]}
+    completes = ~(np.isnan(offres["taux_interet"]) | np.isnan(offres["duree_pret"]))
+    offres = {nom: np.nan_to_num(valeurs[completes]) for nom, valeurs in offres.items()}
+    # Offres sans nom de banque désignées par leur ligne dans le tableau
+    banques = np.array([banque if isinstance(banque, str) and banque.strip() else f"Offre {indice + 1}"
+                        for indice, banque in enumerate(df_offres["banque"])], dtype=object)[completes]
+    duree_pret = offres["duree_pret"].astype(np.int64)
+    assurance_annuelle = offres["assurance_emprunteur_annuelle"]
+    frais_dossier = offres["frais_de_dossier"]
+    frais_garantie = offres["frais_de_garantie"]
+    frais_courtage = offres["frais_de_courtage"]
+
+    resultats = calculer_financement(
+        projet["revenu_annuel"], projet["valeur_bien"], projet["apport_personnel"],
+        offres["taux_interet"] / 100, duree_pret, assurance_annuelle,
+        projet["frais_de_notaire"], frais_garantie, frais_dossier, frais_courtage,
+        projet["frais_agence_immobiliere"], projet["ptz"], projet["pel"])
+    taeg = taeg_depuis_simulation(resultats["montant_total_finance"], resultats["mensualite"], assurance_annuelle,
+                                  duree_pret, frais_dossier, frais_garantie, frais_courtage)
+    capital_net = (resultats["montant_total_finance"] - frais_dossier - frais_garantie - frais_courtage
+                   - assurance_annuelle * duree_pret)
+
+    comparatif = {
+        "banque": banques,
+        **offres,
+        "duree_pret": duree_pret,
+        "montant_total_finance": resultats["montant_total_finance"],
+        "mensualite": resultats["mensualite"],
+        "mensualite_totale": resultats["mensualite_totale"],
+        "paiement_total": resultats["paiement_total"],
+        "cout_credit": np.round(resultats["mensualite"] * duree_pret * 12 - capital_net, 2),
+        "taeg": np.round(taeg * 100, 2),
+        "taux_endettement": resultats["taux_endettement"],
+        "au_dessus_seuil": resultats["taux_endettement"] > SEUIL_ENDETTEMENT,
+    }
+    for colonne in CRITERES_CLASSEMENT.values():
+        # Rang minimal en cas d'égalité : 1 + nombre d'offres strictement meilleures
+        valeurs = comparatif[colonne]
+        comparatif[f"rang_{colonne}"] = 1 + (valeurs[None, :] < valeurs[:, None]).sum(axis=1)
+    return pd.DataFrame(comparatif)
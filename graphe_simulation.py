@@ -0,0 +1,122 @@
+import math
+
+from calculs_financement import facteur_annuite, taeg_depuis_simulation
+
+# Graphe de dépendances de la simulation : chaque grandeur déclare les grandeurs dont elle dépend.
+# La modification d'une saisie n'invalide que ses descendants, recalculés à la demande.
+
+# Saisies du plan de financement et valeur par défaut, fixe ou déduite d'autres grandeurs
+SAISIES = {
+    "revenu_annuel": ((), lambda: 60000.0),
+    "valeur_bien": ((), lambda: 200000.0),
+    "apport_personnel": (("valeur_bien",), lambda valeur_bien: round(0.15 * valeur_bien, 2)),
+    "taux_interet": ((), lambda: 3.5),
+    "duree_pret": ((), lambda: 25),
+    "assurance_emprunteur_annuelle": (("montant_pret",), lambda montant_pret: round(0.0035 * montant_pret, 2)),
+    "frais_de_notaire": (("valeur_bien",), lambda valeur_bien: round(0.075 * valeur_bien, 2)),
+    "frais_de_garantie": (("montant_pret",), lambda montant_pret: round(0.015 * montant_pret, 2)),
+    "frais_de_dossier": (("montant_pret",), lambda montant_pret: round(0.008 * montant_pret, 2)),
+    "frais_de_courtage": (("montant_pret",), lambda montant_pret: round(0.01 * montant_pret, 2)),
+    "frais_agence_immobiliere": (("valeur_bien",), lambda valeur_bien: round(0.04 * valeur_bien, 2)),
+    "ptz": ((), lambda: 0.0),
+    "pel": ((), lambda: 0.0),
+}
+
+# Grandeurs calculées, mêmes formules que calculer_financement
+CALCULS = {
+    "montant_pret": (("valeur_bien", "apport_personnel"), lambda valeur, apport: valeur - apport),
+    "cout_total_frais": (
+        ("frais_de_notaire", "frais_de_garantie", "frais_de_dossier", "frais_de_courtage",
+         "frais_agence_immobiliere", "assurance_emprunteur_annuelle", "duree_pret"),
+        lambda notaire, garantie, dossier, courtage, agence, assurance, duree:
+            round(notaire + garantie + dossier + courtage + agence + assurance * duree, 2)),
+    "montant_total_finance": (
+        ("montant_pret", "cout_total_frais", "ptz", "pel"),
+        lambda montant_pret, cout_total_frais, ptz, pel: max(round(montant_pret + cout_total_frais - ptz - pel, 2), 0.0)),
+    "facteur_annuite": (("taux_interet", "duree_pret"), lambda taux, duree: float(facteur_annuite(taux / 100, duree * 12))),
+    "mensualite": (("montant_total_finance", "facteur_annuite"), lambda montant, facteur: round(montant * facteur, 2)),
+    "assurance_mensuelle": (("assurance_emprunteur_annuelle",), lambda assurance: round(assurance / 12, 2)),
+    "mensualite_totale": (("mensualite", "assurance_mensuelle"), lambda mensualite, assurance: round(mensualite + assurance, 2)),
+    "paiement_total": (
+        ("mensualite", "duree_pret", "assurance_emprunteur_annuelle"),
+        lambda mensualite, duree, assurance: round(mensualite * duree * 12 + assurance * duree, 2)),
+    "interet_total": (("paiement_total", "montant_pret"), lambda paiement, montant_pret: round(paiement - montant_pret, 2)),
+    "revenu_mensuel": (("revenu_annuel",), lambda revenu: round(revenu / 12, 2)),
+    "taux_endettement": (
+        ("mensualite_totale", "revenu_mensuel"),
+        lambda mensualite_totale, revenu_mensuel: round(mensualite_totale / revenu_mensuel * 100, 2) if revenu_mensuel else math.inf),
+    "taeg": (
+        ("montant_total_finance", "mensualite", "assurance_emprunteur_annuelle", "duree_pret",
+         "frais_de_dossier", "frais_de_garantie", "frais_de_courtage"),
+        lambda montant, mensualite, assurance, duree, dossier, garantie, courtage:
+            round(float(taeg_depuis_simulation(montant, mensualite, assurance, duree, dossier, garantie, courtage)) * 100, 2)),
+}
+
+
+class GrapheSimulation:
+    """
+    Graphe des grandeurs de la simulation avec recalcul incrémental.
+    Une saisie fixée par l'utilisateur remplace sa valeur par défaut et coupe la propagation depuis l'amont.
+    """
+
+    def __init__(self):
+        self.noeuds = {**SAISIES, **CALCULS}
+        self.dependants = {nom: [] for nom in self.noeuds}
+        for nom, (dependances, _) in self.noeuds.items():
+            for dependance in dependances:
+                self.dependants[dependance].append(nom)
+        self.fixees = {}
+        self.valeurs = {}
+        self.a_recalculer = set(self.noeuds)
+        self.recalcules = []
+
+    def _invalider(self, nom):
+        pile = [nom]
+        while pile:
+            courant = pile.pop()
+            self.a_recalculer.add(courant)
+            # Une saisie fixée ne dépend plus de l'amont
+            pile.extend(dependant for dependant in self.dependants[courant]
+                        if dependant not in self.a_recalculer and dependant not in self.fixees)
+
+    def definir(self, nom, valeur):
+        """
+        Fixe la valeur d'une saisie et invalide ses descendants.
+        """
+        if self.fixees.get(nom) == valeur and nom not in self.a_recalculer:
+            return
+        self.fixees[nom] = valeur
+        self._invalider(nom)
+
+    def liberer(self, nom):
+        """
+        Rend à une saisie sa valeur par défaut, déduite des autres grandeurs.
+        """
+        if self.fixees.pop(nom, None) is not None:
+            self._invalider(nom)
+
+    def est_fixee(self, nom):
+        return nom in self.fixees
+
+    def valeur(self, nom):
+        """
+        Retourne la valeur d'une grandeur, en ne recalculant que ce qui a été invalidé.
+        """
+        if nom in self.a_recalculer:
+            if nom in self.fixees:
+                self.valeurs[nom] = self.fixees[nom]
+            else:
+                dependances, fonction = self.noeuds[nom]
+                self.valeurs[nom] = fonction(*(self.valeur(dependance) for dependance in dependances))
+            self.a_recalculer.discard(nom)
+            self.recalcules.append(nom)
+        return self.valeurs[nom]
+
+    def recalculer(self):
+        """
+        Met à jour toutes les grandeurs et retourne la liste de celles qui ont été recalculées.
+        """
+        self.recalcules = []
+        for nom in self.noeuds:
+            self.valeur(nom)
+        return self.recalcules
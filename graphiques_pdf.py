@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")  # Rendu local, sans navigateur ni affichage
+import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
+
+from calculs_financement import (comparer_mensualites_taux_endettement, comparer_mensualites_valeur_bien,
+                                 en_centimes, tableau_amortissement_centimes)
+
+# Graphiques du rapport PDF, rendus avec matplotlib et mis en cache sur disque :
+# le nom du fichier est l'empreinte des données, un même graphique n'est donc rendu qu'une fois.
+# Le cache est borné en taille, les images les moins récemment utilisées étant supprimées en premier.
+
+DOSSIER_GRAPHIQUES = Path(__file__).resolve().parent / "cache_graphiques"
+VERSION_GRAPHIQUES = 1  # À incrémenter lorsque le rendu change, pour invalider le cache
+RESOLUTION = 150
+TAILLE = (8, 4.5)
+TAILLE_MAX_CACHE_MO = 20  # Environ 300 images, soit une centaine de simulations
+DELAI_PROTECTION_S = 300  # Une image utilisée récemment peut encore être lue par un PDF en cours
+
+
+def _chemin_en_cache(nom, donnees, dossier):
+    empreinte = hashlib.sha256(json.dumps([VERSION_GRAPHIQUES, nom, donnees]).encode()).hexdigest()[:32]
+    return Path(dossier or DOSSIER_GRAPHIQUES) / f"{nom}_{empreinte}.png"
+
+
+def _est_en_cache(chemin):
+    """
+    Indique si l'image est en cache, en la marquant comme récemment utilisée.
+    """
+    try:
+        os.utime(chemin)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _limiter_cache(dossier):
+    """
+    Supprime les images les moins récemment utilisées tant que le cache dépasse TAILLE_MAX_CACHE_MO.
+    Les images utilisées depuis moins de DELAI_PROTECTION_S ne sont jamais supprimées : un rapport
+    reçoit les chemins de ses graphiques avant que FPDF ne lise les fichiers.
+    """
+    fichiers = []
+    for chemin in dossier.glob("*.png"):
+        try:
+            etat = chemin.stat()
+        except FileNotFoundError:
+            continue
+        fichiers.append((etat.st_mtime, etat.st_size, chemin))
+    taille_totale = sum(taille for _, taille, _ in fichiers)
+    limite_protection = time.time() - DELAI_PROTECTION_S
+    for date_utilisation, taille, chemin in sorted(fichiers):
+        if taille_totale <= TAILLE_MAX_CACHE_MO * 1024 ** 2 or date_utilisation >= limite_protection:
+            break
+        chemin.unlink(missing_ok=True)
+        taille_totale -= taille
+
+
+def _enregistrer(fig, chemin):
+    """
+    Enregistre la figure par un fichier temporaire puis un renommage, pour que des processus
+    concurrents ne lisent jamais une image partielle, puis ramène le cache sous sa taille maximale.
+    """
+    chemin.parent.mkdir(exist_ok=True)
+    chemin_temporaire = chemin.with_suffix(f".{os.getpid()}.tmp")
+    # Marges fixes plutôt que tight_layout, qui coûte une passe de rendu supplémentaire
+    fig.subplots_adjust(left=0.12, right=0.88, bottom=0.12, top=0.9)
+    fig.canvas.draw()
+    pixels = np.asarray(fig.canvas.buffer_rgba())[..., :3]
+    plt.close(fig)
+    # PNG sans canal alpha, que FPDF intègre sans décoder les pixels un à un ;
+    # compression rapide, le fichier n'étant lu qu'en local
+    Image.fromarray(pixels).save(chemin_temporaire, format="png", compress_level=1)
+    os.replace(chemin_temporaire, chemin)
+    _limiter_cache(chemin.parent)
+    return str(chemin)
+
+
+def _tracer_comparaison(mensualite_actuelle, mensualites, valeurs, couleur, titre, legende, titre_axe_y):
+    fig, ax = plt.subplots(figsize=TAILLE, dpi=RESOLUTION)
+    ax.plot(mensualites, valeurs, marker="o", color=couleur, linewidth=2, label=legende)
+    ax.axvline(mensualite_actuelle, color="red", linestyle="--")
+    ax.annotate(f"Mensualité actuelle: {mensualite_actuelle:,.2f} €".replace(",", " ").replace(".", ","),
+                xy=(mensualite_actuelle, max(valeurs)), xytext=(10, -5), textcoords="offset points")
+    ax.set_title(titre)
+    ax.set_xlabel("Mensualité (€)")
+    ax.set_ylabel(titre_axe_y)
+    ax.grid(alpha=0.3)
+    ax.legend(loc="lower right")
+    return fig
+
+
+def graphique_comparaison_valeur_bien(mensualite_actuelle, valeur_bien_actuelle, dossier=None):
+    """
+    Retourne le chemin de l'image du graphique « Comparaison des mensualités et valeur du bien ».
+    Les images sont rangées dans dossier, par défaut le cache DOSSIER_GRAPHIQUES.
+    """
+    chemin = _chemin_en_cache("valeur_bien", [mensualite_actuelle, valeur_bien_actuelle], dossier)
+    if _est_en_cache(chemin):
+        return str(chemin)
+    mensualites, valeurs_bien = comparer_mensualites_valeur_bien(mensualite_actuelle, valeur_bien_actuelle)
+    fig = _tracer_comparaison(mensualite_actuelle, mensualites, valeurs_bien, "blue",
+                              "Comparaison des mensualités et valeur du bien",
+                              "Comparaison des mensualités", "Valeur du bien (€)")
+    return _enregistrer(fig, chemin)
+
+
+def graphique_comparaison_taux_endettement(mensualite_actuelle, revenu_annuel, dossier=None):
+    """
+    Retourne le chemin de l'image du graphique « Comparaison des taux d'endettement en fonction des mensualités ».
+    """
+    chemin = _chemin_en_cache("taux_endettement", [mensualite_actuelle, revenu_annuel], dossier)
+    if _est_en_cache(chemin):
+        return str(chemin)
+    mensualites, taux_endettements = comparer_mensualites_taux_endettement(mensualite_actuelle, revenu_annuel)
+    fig = _tracer_comparaison(mensualite_actuelle, mensualites, taux_endettements, "green",
+                              "Comparaison des taux d'endettement en fonction des mensualités",
+                              "Comparaison des taux d'endettement", "Taux d'endettement (%)")
+    return _enregistrer(fig, chemin)
+
+
+def graphique_amortissement(montant_total_finance, taux_interet, duree_pret_annees, mensualite, assurance_annuelle,
+                            dossier=None):
+    """
+    Retourne le chemin de l'image du tableau d'amortissement par année : capital remboursé,
+    intérêts et assurance en barres empilées, capital restant dû en courbe.
+    Les montants sont en euros, le taux d'intérêt en décimal ; l'échéancier est calculé au centime près.
+    """
+    donnees = [montant_total_finance, taux_interet, duree_pret_annees, mensualite, assurance_annuelle]
+    chemin = _chemin_en_cache("amortissement", donnees, dossier)
+    if _est_en_cache(chemin):
+        return str(chemin)
+
+    echeancier = tableau_amortissement_centimes(en_centimes(montant_total_finance), taux_interet, int(duree_pret_annees),
+                                                en_centimes(mensualite), en_centimes(assurance_annuelle))
+    par_annee = {nom: valeurs.reshape(-1, 12) / 100 for nom, valeurs in echeancier.items()}
+    annees = np.arange(1, int(duree_pret_annees) + 1)
+    capital = par_annee["capital"].sum(axis=1)
+    interets = par_annee["interets"].sum(axis=1)
+    assurance = par_annee["assurance"].sum(axis=1)
+
+    fig, ax = plt.subplots(figsize=TAILLE, dpi=RESOLUTION)
+    ax.bar(annees, capital, color="#9B4819", label="Capital remboursé")
+    ax.bar(annees, interets, bottom=capital, color="#E0A47A", label="Intérêts")
+    ax.bar(annees, assurance, bottom=capital + interets, color="#C9C3B5", label="Assurance")
+    ax.set_title("Tableau d'amortissement par année")
+    ax.set_xlabel("Année")
+    ax.set_ylabel("Remboursements annuels (€)")
+    ax_capital = ax.twinx()
+    ax_capital.plot(annees, par_annee["capital_restant"][:, -1], color="#0C141A", linewidth=2, label="Capital restant dû")
+    ax_capital.set_ylabel("Capital restant dû (€)")
+    ax_capital.set_ylim(bottom=0)
+    lignes, libelles = ax.get_legend_handles_labels()
+    lignes_capital, libelles_capital = ax_capital.get_legend_handles_labels()
+    ax.legend(lignes + lignes_capital, libelles + libelles_capital, loc="upper center", ncol=4, fontsize=8)
+    ax.set_ylim(top=ax.get_ylim()[1] * 1.15)
+    return _enregistrer(fig, chemin)
@@ -0,0 +1,40 @@
+import numpy as np
+
+# Portefeuille de prêts généré aléatoirement, un tableau numpy par saisie, utilisé par le stress test,
+# la génération de rapports par lots, les tests et les mesures de performance.
+
+COLONNES_PORTEFEUILLE = [
+    "revenu_annuel", "valeur_bien", "apport", "taux_interet", "duree_pret_annees",
+    "assurance_annuelle", "frais_notaire", "frais_garantie", "frais_dossier",
+    "frais_courtage", "frais_agence", "ptz", "pel",
+]
+
+
+def generer_portefeuille(nombre_prets, graine=0):
+    """
+    Génère un portefeuille de simulations aléatoires : apport tiré entre 0 et 30 % du prix du bien,
+    pour que le choc sur la valeur du bien touche une partie seulement des prêts, et frais déduits
+    avec les taux par défaut du plan de financement (notaire 7,5 %, garantie 1,5 %, etc.).
+    """
+    rng = np.random.default_rng(graine)
+    revenu_annuel = np.round(rng.uniform(30_000, 150_000, nombre_prets), 2)
+    valeur_bien = np.round(revenu_annuel * rng.uniform(2.5, 5.0, nombre_prets), 2)
+    taux_interet = np.round(rng.uniform(0.02, 0.05, nombre_prets), 4)
+    duree_pret_annees = rng.integers(10, 26, nombre_prets).astype(float)
+    apport = np.round(rng.uniform(0.0, 0.30, nombre_prets) * valeur_bien, 2)
+    montant_pret = valeur_bien - apport
+    return {
+        "revenu_annuel": revenu_annuel,
+        "valeur_bien": valeur_bien,
+        "apport": apport,
+        "taux_interet": taux_interet,
+        "duree_pret_annees": duree_pret_annees,
+        "assurance_annuelle": np.round(0.0035 * montant_pret, 2),
+        "frais_notaire": np.round(0.075 * valeur_bien, 2),
+        "frais_garantie": np.round(0.015 * montant_pret, 2),
+        "frais_dossier": np.round(0.008 * montant_pret, 2),
+        "frais_courtage": np.round(0.01 * montant_pret, 2),
+        "frais_agence": np.round(0.04 * valeur_bien, 2),
+        "ptz": np.zeros(nombre_prets),
+        "pel": np.zeros(nombre_prets),
+    }
@@ -0,0 +1,164 @@
+import os
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+from fpdf import FPDF
+
+# Rapport PDF de la simulation, indépendant de Streamlit pour pouvoir être généré hors de l'application.
+
+# Logo cherché à côté du module, quel que soit le dossier courant
+LOGO = str(Path(__file__).resolve().parent / "1_Logo.png")
+
+
+@lru_cache(maxsize=32)
+def _analyser_png(chemin, date_modification, taille):
+    """
+    Analyse une image PNG pour fpdf, une seule fois par version du fichier (date de modification et taille).
+    fpdf 1.7 ne garde les images analysées que pour le document en cours : l'analyse du logo,
+    un PNG avec transparence, représentait l'essentiel du temps de création de chaque rapport.
+    """
+    return FPDF()._parsepng(chemin)
+
+
+def creer_pdf(df_resultats, logo_path=LOGO, graphiques=None):
+    """
+    Crée un fichier PDF des résultats de la simulation avec un en-tête et un pied de page
+    personnalisés incluant le logo, le titre, et la mention des droits.
+    Le tableau est centré, et les textes longs dans les cellules sont renvoyés à la ligne.
+    Les graphiques (chemins d'images) sont ajoutés à la suite, deux par page.
+    """
+    class PDF(FPDF):
+        def _parsepng(self, name):
+            etat = os.stat(name)
+            # Copie : fpdf numérote l'image et libère ses données dans chaque document
+            info = dict(_analyser_png(name, etat.st_mtime_ns, etat.st_size))
+            # Une image avec transparence impose la version 1.4, comme lors de l'analyse par fpdf
+            if "smask" in info and self.pdf_version < "1.4":
+                self.pdf_version = "1.4"
+            return info
+
+        def header(self):
+            # Ajouter le logo
+            self.image(logo_path, 10, 8, 25)  # (x, y, largeur)
+            
+            # Ajustement de la position pour éviter le chevauchement avec le logo
+            self.set_xy(35, 10)  # Positionner le texte un peu plus à droite pour éviter le chevauchement
+            
+            # Titre principal
+            self.set_font('Arial', 'B', 17)
+            self.cell(150, 10, "Simulation de financement immobilier", ln=True, align='C')
+            
+            # Phrase descriptive centrée (ajustée)
+            self.set_font('Arial', '', 12)
+            self.cell(200, 10, "Cette application vous permet de simuler votre financement immobilier", ln=True, align='C')
+            self.cell(200, 5, "en fonction de divers paramètres financiers.", ln=True, align='C')
+            
+            # Ligne de séparation
+            self.set_draw_color(169, 169, 169)  # Couleur gris pour la ligne
+            self.set_line_width(0.5)
+            self.line(10, 40, 200, 40)  # Ligne horizontale (x1, y1, x2, y2)
+            self.ln(10)  # Espacement après l'en-tête
+        
+        def footer(self):
+            # Positionnement à 1.5 cm du bas
+            self.set_y(-30)
+            
+            # Ligne de séparation
+            self.set_draw_color(169, 169, 169)
+            self.set_line_width(0.5)
+            self.line(10, self.get_y(), 200, self.get_y())  # Ligne horizontale
+            
+            # Logo dans le pied de page
+            self.image(logo_path, 95, self.get_y() + 5, 20)  # (x, y, largeur)
+            self.ln(20)
+            
+            # Texte du pied de page
+            self.set_font('Arial', 'I', 8)
+            self.cell(0, 10, "© 2024 - Simulation de financement immobilier. Réalisé par CBorges. Tous droits réservés.", align='C')
+
+    # Initialiser le PDF
+    pdf = PDF()
+    pdf.add_page()
+    
+    # Taille de la police pour les tableaux
+    pdf.set_font('Arial', 'B', 12)
+    
+    # Largeurs des colonnes
+    col_width_desc = 90
+    col_width_value = 80
+    line_height = pdf.font_size * 1.5
+    
+    # Calculer la position initiale pour centrer le tableau
+    table_x = (210 - (col_width_desc + col_width_value)) / 2
+    pdf.set_x(table_x)
+
+    # Couleurs pour l'en-tête du tableau
+    pdf.set_fill_color(155, 72, 25)  # Couleur de l'en-tête (code couleur #9B4819)
+    pdf.set_text_color(255, 255, 255)  # Texte en blanc pour l'en-tête
+
+    # En-têtes du tableau
+    pdf.cell(col_width_desc, line_height, 'Description', border=1, align='C', fill=True)
+    pdf.cell(col_width_value, line_height, 'Valeur', border=1, align='C', fill=True)
+    pdf.ln(line_height)
+    
+    # Remplir les cellules du tableau
+    pdf.set_font('Arial', '', 10)  # Reset font for the table content
+    pdf.set_text_color(0, 0, 0)  # Texte noir pour le contenu
+    fill = False  # Toggle for row background color
+
+    # Fonction pour renvoyer à la ligne si le texte est trop long
+    def multi_cell_with_centering(pdf, width, height, text, fill):
+        # Sauvegarder la position actuelle
+        x = pdf.get_x()
+        y = pdf.get_y()
+        
+        # Centrer la cellule
+        pdf.multi_cell(width, height, text, border=1, align='C', fill=fill)
+        
+        # Retourner à la position de départ pour la prochaine cellule
+        pdf.set_xy(x + width, y)
+
+    # Obtenir la hauteur maximale de chaque ligne et ajuster
+    def ajuster_ligne(pdf, desc, val, col_width_desc, col_width_value, line_height, fill):
+        # Calcul de la hauteur requise pour chaque cellule de la ligne
+        desc_height = pdf.get_string_width(desc) / col_width_desc * line_height
+        val_height = pdf.get_string_width(val) / col_width_value * line_height
+        max_height = max(desc_height, val_height, line_height)  # Obtenir la hauteur max
+
+        # Fixer la hauteur de la ligne pour les deux colonnes en fonction de la cellule la plus haute
+        pdf.set_x(table_x)  # S'assurer que le tableau reste centré
+        pdf.multi_cell(col_width_desc, max_height, desc, border=1, align='C', fill=fill)
+        pdf.set_xy(table_x + col_width_desc, pdf.get_y() - max_height)  # Retour pour ajouter la valeur
+        pdf.multi_cell(col_width_value, max_height, val, border=1, align='C', fill=fill)
+
+    for index, row in df_resultats.iterrows():
+        description = row['Description']
+        valeur = row['Valeur'].replace('€', 'EUR').replace('.', ',')  # Remplacer le caractère '€' par 'EUR' et le séparateur décimal par une virgule
+
+        # Couleur de fond alternée
+        if fill:
+            pdf.set_fill_color(240, 240, 240)  # Gris clair
+        else:
+            pdf.set_fill_color(255, 255, 255)  # Blanc
+
+        # Utilisation de ajuster_ligne pour ajuster automatiquement la hauteur de la ligne
+        ajuster_ligne(pdf, description, valeur, col_width_desc, col_width_value, line_height, fill)
+
+        # Alterner la couleur de fond
+        fill = not fill
+
+    # Ajouter les graphiques, deux par page sous l'en-tête
+    for index, chemin_graphique in enumerate(graphiques or []):
+        if index % 2 == 0:
+            pdf.add_page()
+            pdf.set_y(45)
+        pdf.image(chemin_graphique, x=20, w=170)
+        pdf.ln(5)
+    
+    # Sauvegarde du PDF dans un buffer BytesIO
+    pdf_output = BytesIO()
+    pdf_content = pdf.output(dest='S').encode('latin1')  # Générer le contenu du PDF en mémoire
+    pdf_output.write(pdf_content)  # Écrire le contenu dans BytesIO
+    pdf_output.seek(0)  # Revenir au début du buffer avant de le retourner
+    return pdf_output
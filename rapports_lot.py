@@ -0,0 +1,125 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from portefeuille import generer_portefeuille
+from rapport_pdf import creer_pdf
+from resultats_simulation import NOMS_SAISIES, calculer_resultats, graphiques_simulation, tableau_resultats
+
+# Génération par lots des rapports PDF, un par client : chaque rapport est rendu dans un processus de calcul
+# et écrit dans l'archive dès qu'il est prêt, seuls les rapports en cours étant gardés en mémoire.
+
+# Correspondance entre les colonnes du portefeuille du stress test et les saisies du plan de financement
+COLONNES_PORTEFEUILLE = {
+    "revenu_annuel": "revenu_annuel", "valeur_bien": "valeur_bien", "apport": "apport_personnel",
+    "taux_interet": "taux_interet", "duree_pret_annees": "duree_pret", "assurance_annuelle": "assurance_emprunteur_annuelle",
+    "frais_notaire": "frais_de_notaire", "frais_garantie": "frais_de_garantie", "frais_dossier": "frais_de_dossier",
+    "frais_courtage": "frais_de_courtage", "frais_agence": "frais_agence_immobiliere", "ptz": "ptz", "pel": "pel",
+}
+
+
+def lire_simulations(chemin_csv):
+    """
+    Lit un fichier CSV avec une ligne par client : une colonne par saisie du plan de financement
+    (taux d'intérêt en %) et une colonne « client » facultative, utilisée pour nommer les rapports.
+    """
+    df_simulations = pd.read_csv(chemin_csv)
+    manquantes = [nom for nom in NOMS_SAISIES if nom not in df_simulations.columns]
+    if manquantes:
+        raise ValueError(f"Colonnes manquantes dans {chemin_csv} : {', '.join(manquantes)}")
+    if "client" not in df_simulations.columns:
+        df_simulations["client"] = [f"client_{indice + 1}" for indice in range(len(df_simulations))]
+    df_simulations["duree_pret"] = df_simulations["duree_pret"].astype(int)
+    return df_simulations[["client", *NOMS_SAISIES]].to_dict("records")
+
+
+def simulations_exemple(nombre_clients, graine=0):
+    """
+    Génère des simulations aléatoires à partir du portefeuille du stress test.
+    """
+    portefeuille = generer_portefeuille(nombre_clients, graine)
+    simulations = []
+    for indice in range(nombre_clients):
+        simulation = {"client": f"client_{indice + 1}"}
+        for colonne, nom in COLONNES_PORTEFEUILLE.items():
+            simulation[nom] = float(portefeuille[colonne][indice])
+        simulation["taux_interet"] = round(simulation["taux_interet"] * 100, 2)
+        simulation["duree_pret"] = int(simulation["duree_pret"])
+        simulations.append(simulation)
+    return simulations
+
+
+def _generer_rapport(indice, simulation, mode_centimes, avec_graphiques):
+    """
+    Rend le rapport PDF d'une simulation dans un processus de calcul et retourne son nom dans l'archive et son contenu.
+    Les graphiques d'un client ne resservent pas : ils sont rendus dans un dossier temporaire supprimé
+    avec le rapport, et non dans le cache partagé de l'application.
+    """
+    resultats = calculer_resultats(simulation, mode_centimes=mode_centimes)
+    df_resultats = tableau_resultats(simulation, resultats=resultats)
+    client = re.sub(r"[^\w-]+", "_", str(simulation.get("client", "client"))).strip("_")
+    with tempfile.TemporaryDirectory(prefix="graphiques_") as dossier_graphiques:
+        graphiques = graphiques_simulation(simulation, resultats, dossier_graphiques) if avec_graphiques else None
+        return f"{indice + 1:04d}_{client}.pdf", creer_pdf(df_resultats, graphiques=graphiques).getvalue()
+
+
+def generer_rapports_lot(simulations, chemin_archive, nombre_processus=None, mode_centimes=False, avec_graphiques=True):
+    """
+    Génère les rapports PDF des simulations en parallèle et les écrit au fil de l'eau dans une archive ZIP.
+    Le nombre de rapports en attente d'écriture est borné à deux par processus.
+    Retourne le nombre de rapports, la durée totale et le débit en rapports par seconde.
+    """
+    nombre_processus = nombre_processus or os.cpu_count()
+    en_vol_max = 2 * nombre_processus
+    simulations = iter(enumerate(simulations))
+    nombre_rapports = 0
+
+    debut = time.perf_counter()
+    # Les PDF sont déjà compressés : archive sans compression, l'écriture ne coûte qu'une copie
+    with zipfile.ZipFile(chemin_archive, "w", compression=zipfile.ZIP_STORED) as archive, \
+            ProcessPoolExecutor(max_workers=nombre_processus) as executeur:
+        en_vol = set()
+        while True:
+            for indice, simulation in simulations:
+                en_vol.add(executeur.submit(_generer_rapport, indice, simulation, mode_centimes, avec_graphiques))
+                if len(en_vol) >= en_vol_max:
+                    break
+            if not en_vol:
+                break
+            terminees, en_vol = wait(en_vol, return_when=FIRST_COMPLETED)
+            for tache in terminees:
+                nom_fichier, contenu = tache.result()
+                archive.writestr(nom_fichier, contenu)
+                nombre_rapports += 1
+    duree = time.perf_counter() - debut
+
+    return {
+        "rapports": nombre_rapports,
+        "duree_s": round(duree, 3),
+        "rapports_par_s": round(nombre_rapports / duree, 1) if duree else float("inf"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génération par lots des rapports PDF de simulation")
+    parser.add_argument("csv", nargs="?", default=None, help="Fichier CSV des simulations, une ligne par client")
+    parser.add_argument("--exemple", type=int, default=None, help="Nombre de simulations aléatoires à générer à la place du CSV")
+    parser.add_argument("--sortie", default="rapports.zip", help="Archive ZIP des rapports")
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus de calcul")
+    parser.add_argument("--centimes", action="store_true", help="Calcul exact au centime près")
+    parser.add_argument("--sans-graphiques", action="store_true", help="Rapports sans les graphiques")
+    arguments = parser.parse_args()
+    if (arguments.csv is None) == (arguments.exemple is None):
+        parser.error("indiquer un fichier CSV ou --exemple")
+
+    simulations = lire_simulations(arguments.csv) if arguments.csv else simulations_exemple(arguments.exemple)
+    rapport = generer_rapports_lot(simulations, arguments.sortie, nombre_processus=arguments.processus,
+                                   mode_centimes=arguments.centimes, avec_graphiques=not arguments.sans_graphiques)
+    print(f"{rapport['rapports']} rapports écrits dans {arguments.sortie} en {rapport['duree_s']:.2f} s, "
+          f"{rapport['rapports_par_s']} rapports/s")
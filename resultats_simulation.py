@@ -0,0 +1,165 @@
+import math
+
+import pandas as pd
+
+from calculs_financement import calculer_financement, calculer_financement_centimes, en_centimes, en_euros, taeg_depuis_simulation
+from graphiques_pdf import graphique_amortissement, graphique_comparaison_taux_endettement, graphique_comparaison_valeur_bien
+
+# Tableau des résultats de la simulation, partagé par l'application et la génération de rapports par lots.
+
+# Saisies du plan de financement, avec les noms utilisés dans st.session_state
+NOMS_SAISIES = [
+    "revenu_annuel", "valeur_bien", "apport_personnel", "taux_interet", "duree_pret",
+    "assurance_emprunteur_annuelle", "frais_de_notaire", "frais_de_garantie", "frais_de_dossier",
+    "frais_de_courtage", "frais_agence_immobiliere", "ptz", "pel",
+]
+
+
+def format_number_fr(number):
+    """
+    Formate un nombre en utilisant une virgule comme séparateur décimal
+    et un espace comme séparateur des milliers, sans dépendre de locale.
+    """
+    # Formater avec deux décimales et un séparateur des milliers
+    return f"{number:,.2f}".replace(',', ' ').replace('.', ',')
+
+
+def format_taeg(taeg):
+    """
+    Formate un TAEG en %. Lorsque le PTZ et le PEL couvrent plus que les frais, le prêt ne met
+    aucun capital à disposition de l'emprunteur une fois les frais et l'assurance déduits :
+    le TAEG n'est pas défini (NaN) et est affiché « non calculable ».
+    """
+    if math.isnan(taeg):
+        return "non calculable"
+    return f"{format_number_fr(taeg)} %"
+
+
+def calculer_resultats(saisies, mode_centimes=False):
+    """
+    Calcule la simulation à partir des saisies du plan de financement (taux d'intérêt en %)
+    et retourne les résultats numériques, en euros : montant total financé, mensualités, paiement total,
+    intérêts totaux, taux d'endettement et TAEG (en %, NaN lorsqu'il n'est pas calculable).
+    """
+    revenu_annuel = saisies["revenu_annuel"]
+    valeur_bien = saisies["valeur_bien"]
+    apport = saisies["apport_personnel"]
+    taux_interet = saisies["taux_interet"] / 100
+    duree_pret_annees = saisies["duree_pret"]
+    assurance_annuelle = saisies["assurance_emprunteur_annuelle"]
+    frais_notaire = saisies["frais_de_notaire"]
+    frais_garantie = saisies["frais_de_garantie"]
+    frais_dossier = saisies["frais_de_dossier"]
+    frais_courtage = saisies["frais_de_courtage"]
+    frais_agence = saisies["frais_agence_immobiliere"]
+    ptz = saisies["ptz"]
+    pel = saisies["pel"]
+
+    if mode_centimes:
+        # Calcul exact en centimes entiers, reconverti en euros pour l'affichage
+        resultats = calculer_financement_centimes(
+            en_centimes(revenu_annuel), en_centimes(valeur_bien), en_centimes(apport), taux_interet, duree_pret_annees,
+            en_centimes(assurance_annuelle), en_centimes(frais_notaire), en_centimes(frais_garantie), en_centimes(frais_dossier),
+            en_centimes(frais_courtage), en_centimes(frais_agence), en_centimes(ptz), en_centimes(pel))
+        resultats = {nom: valeur if nom == "taux_endettement" else en_euros(valeur) for nom, valeur in resultats.items()}
+    else:
+        resultats = calculer_financement(revenu_annuel, valeur_bien, apport, taux_interet, duree_pret_annees,
+                                         assurance_annuelle, frais_notaire, frais_garantie, frais_dossier,
+                                         frais_courtage, frais_agence, ptz, pel)
+    resultats = {nom: float(resultats[nom]) for nom in (
+        "montant_total_finance", "mensualite", "mensualite_totale", "paiement_total", "interet_total", "taux_endettement")}
+    resultats["taeg"] = round(float(taeg_depuis_simulation(
+        resultats["montant_total_finance"], resultats["mensualite"], assurance_annuelle, duree_pret_annees,
+        frais_dossier, frais_garantie, frais_courtage)) * 100, 2)
+    return resultats
+
+
+def tableau_resultats(saisies, mode_centimes=False, resultats=None):
+    """
+    Renvoie le DataFrame des résultats affiché dans l'application et repris dans le PDF.
+    Les résultats numériques de calculer_resultats peuvent être passés pour ne pas refaire la simulation.
+    """
+    if resultats is None:
+        resultats = calculer_resultats(saisies, mode_centimes)
+    revenu_annuel = saisies["revenu_annuel"]
+    valeur_bien = saisies["valeur_bien"]
+    apport = saisies["apport_personnel"]
+    taux_interet = saisies["taux_interet"] / 100
+    duree_pret_annees = saisies["duree_pret"]
+    assurance_annuelle = saisies["assurance_emprunteur_annuelle"]
+    frais_notaire = saisies["frais_de_notaire"]
+    frais_garantie = saisies["frais_de_garantie"]
+    frais_dossier = saisies["frais_de_dossier"]
+    frais_courtage = saisies["frais_de_courtage"]
+    frais_agence = saisies["frais_agence_immobiliere"]
+    ptz = saisies["ptz"]
+    pel = saisies["pel"]
+
+    montant_total_finance = resultats["montant_total_finance"]
+    mensualite = resultats["mensualite"]
+    mensualite_totale = resultats["mensualite_totale"]
+    paiement_total = resultats["paiement_total"]
+    interet_total = resultats["interet_total"]
+    taux_endettement = resultats["taux_endettement"]
+    taeg = resultats["taeg"]
+
+    df_resultats = pd.DataFrame({
+        "Description": [
+            "Revenu annuel avant impôt", "Valeur du bien/ prix d'achat", "Apport personnel", 
+            "Frais de notaire", "Frais de garantie", "Frais de dossier", 
+            "Frais de courtage", "Frais d'agence immobilière", 
+            "Assurance emprunteur annuelle", "Assurance emprunteur totale", 
+            "PTZ", "PEL", "Taux d'intérêt", 
+            "Durée du prêt (années)", "Paiement total", 
+            "Intérêts totaux", "Mensualité hors assurance", 
+            "Mensualité avec assurance", "Montant total financé", 
+            "TAEG (frais et assurance inclus)",
+            "Taux d'endettement (mensualité avec assurance)"
+        ],
+        "Valeur": [
+            f"{format_number_fr(revenu_annuel)} €", 
+            f"{format_number_fr(valeur_bien)} €", 
+            f"{format_number_fr(apport)} €", 
+            f"{format_number_fr(frais_notaire)} €", 
+            f"{format_number_fr(frais_garantie)} €", 
+            f"{format_number_fr(frais_dossier)} €", 
+            f"{format_number_fr(frais_courtage)} €", 
+            f"{format_number_fr(frais_agence)} €", 
+            f"{format_number_fr(assurance_annuelle)} €", 
+            f"{format_number_fr(assurance_annuelle * duree_pret_annees)} €", 
+            f"{format_number_fr(ptz)} €", 
+            f"{format_number_fr(pel)} €", 
+            f"{format_number_fr(taux_interet * 100)} %", 
+            f"{duree_pret_annees} ans", 
+            f"{format_number_fr(paiement_total)} €", 
+            f"{format_number_fr(interet_total)} €", 
+            f"{format_number_fr(mensualite)} €", 
+            f"{format_number_fr(mensualite_totale)} €", 
+            f"{format_number_fr(montant_total_finance)} €", 
+            format_taeg(taeg), 
+            f"Prédiction du taux estimé à {format_number_fr(taux_endettement)} %"
+        ]
+    })
+    
+    return df_resultats
+
+
+def graphiques_simulation(saisies, resultats, dossier=None):
+    """
+    Rend (ou relit en cache) les deux graphiques de comparaison et le tableau d'amortissement
+    d'une simulation à partir de ses résultats numériques (calculer_resultats), et retourne
+    les chemins des images pour le PDF.
+    Les images sont rangées dans dossier, par défaut le cache partagé des graphiques.
+    """
+    return [
+        graphique_comparaison_valeur_bien(resultats["mensualite_totale"], saisies["valeur_bien"], dossier),
+        graphique_comparaison_taux_endettement(resultats["mensualite_totale"], saisies["revenu_annuel"], dossier),
+        graphique_amortissement(
+            resultats["montant_total_finance"],
+            saisies["taux_interet"] / 100,
+            saisies["duree_pret"],
+            resultats["mensualite"],
+            saisies["assurance_emprunteur_annuelle"],
+            dossier
+        ),
+    ]
@@ -0,0 +1,143 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from cache_resultats import enregistrer_resultats
+from calculs_financement import SEUIL_ENDETTEMENT, calculer_financement
+from portefeuille import COLONNES_PORTEFEUILLE, generer_portefeuille
+
+# Stress test d'un portefeuille de prêts : le portefeuille est chargé une seule fois
+# en mémoire partagée, les processus de calcul s'y attachent sans copie ni sérialisation.
+
+SCENARIOS_PAR_DEFAUT = [
+    {"nom": "Référence", "baisse_revenu": 0.0, "hausse_taux": 0.0, "baisse_valeur_bien": 0.0},
+    {"nom": "Baisse des revenus de 10 %", "baisse_revenu": 0.10, "hausse_taux": 0.0, "baisse_valeur_bien": 0.0},
+    {"nom": "Hausse des taux de 2 points", "baisse_revenu": 0.0, "hausse_taux": 0.02, "baisse_valeur_bien": 0.0},
+    {"nom": "Baisse de la valeur du bien de 20 %", "baisse_revenu": 0.0, "hausse_taux": 0.0, "baisse_valeur_bien": 0.20},
+    {"nom": "Scénario combiné", "baisse_revenu": 0.10, "hausse_taux": 0.02, "baisse_valeur_bien": 0.20},
+]
+
+# Tableaux partagés, attachés une fois par processus de calcul
+_memoires = {}
+_tableaux = {}
+
+
+def _attacher(descripteurs):
+    """
+    Initialisation d'un processus de calcul : rattache les blocs de mémoire partagée par leur nom.
+    """
+    for nom, (nom_memoire, forme) in descripteurs.items():
+        memoire = shared_memory.SharedMemory(name=nom_memoire)
+        _memoires[nom] = memoire
+        _tableaux[nom] = np.ndarray(forme, dtype=np.float64, buffer=memoire.buf)
+
+
+def _calculer_bloc(indice_scenario, debut, fin, scenario):
+    """
+    Applique un scénario de choc à une tranche du portefeuille et écrit le taux d'endettement
+    dans le tableau de résultats partagé. Seuls des agrégats sont renvoyés au processus principal.
+    """
+    entrees = {nom: _tableaux[nom][debut:fin] for nom in COLONNES_PORTEFEUILLE}
+    entrees["revenu_annuel"] = entrees["revenu_annuel"] * (1 - scenario["baisse_revenu"])
+    entrees["taux_interet"] = entrees["taux_interet"] + scenario["hausse_taux"]
+    resultats = calculer_financement(**entrees)
+
+    taux_endettement = resultats["taux_endettement"]
+    _tableaux["taux_endettement"][indice_scenario, debut:fin] = taux_endettement
+
+    # La baisse de la valeur du bien ne modifie pas le prêt mais la garantie qu'il représente
+    valeur_bien_choquee = entrees["valeur_bien"] * (1 - scenario["baisse_valeur_bien"])
+    return (
+        indice_scenario,
+        int(np.count_nonzero(taux_endettement > SEUIL_ENDETTEMENT)),
+        int(np.count_nonzero(resultats["montant_pret"] > valeur_bien_choquee)),
+    )
+
+
+def executer_stress_test(portefeuille, scenarios=None, nombre_processus=None, taille_bloc=25_000, avec_details=False):
+    """
+    Exécute les scénarios de choc sur le portefeuille en répartissant les tranches entre plusieurs processus.
+    Retourne un DataFrame avec, par scénario, la distribution du taux d'endettement,
+    la part des prêts au-dessus de 35 % et la part des prêts dont le capital dépasse la valeur du bien.
+    Avec avec_details, retourne aussi le taux d'endettement de chaque prêt, une colonne par scénario.
+    """
+    scenarios = scenarios or SCENARIOS_PAR_DEFAUT
+    nombre_processus = nombre_processus or os.cpu_count()
+    nombre_prets = len(portefeuille["revenu_annuel"])
+
+    formes = {nom: (nombre_prets,) for nom in COLONNES_PORTEFEUILLE}
+    formes["taux_endettement"] = (len(scenarios), nombre_prets)
+
+    memoires = {}
+    try:
+        # Chargement unique du portefeuille en mémoire partagée
+        for nom, forme in formes.items():
+            memoire = shared_memory.SharedMemory(create=True, size=int(np.prod(forme)) * 8)
+            memoires[nom] = memoire
+            tableau = np.ndarray(forme, dtype=np.float64, buffer=memoire.buf)
+            if nom in portefeuille:
+                tableau[:] = portefeuille[nom]
+        descripteurs = {nom: (memoire.name, formes[nom]) for nom, memoire in memoires.items()}
+
+        taches = [
+            (indice, debut, min(debut + taille_bloc, nombre_prets), scenario)
+            for indice, scenario in enumerate(scenarios)
+            for debut in range(0, nombre_prets, taille_bloc)
+        ]
+        au_dessus_seuil = np.zeros(len(scenarios), dtype=np.int64)
+        capital_superieur_valeur = np.zeros(len(scenarios), dtype=np.int64)
+        with ProcessPoolExecutor(max_workers=nombre_processus, initializer=_attacher, initargs=(descripteurs,)) as executeur:
+            for indice, nombre_au_dessus, nombre_capital in executeur.map(_calculer_bloc, *zip(*taches)):
+                au_dessus_seuil[indice] += nombre_au_dessus
+                capital_superieur_valeur[indice] += nombre_capital
+
+        taux_endettement = np.ndarray(formes["taux_endettement"], dtype=np.float64, buffer=memoires["taux_endettement"].buf)
+        quantiles = np.percentile(taux_endettement, [5, 25, 50, 75, 95], axis=1)
+        df_synthese = pd.DataFrame({
+            "Scénario": [scenario["nom"] for scenario in scenarios],
+            "Taux d'endettement moyen (%)": taux_endettement.mean(axis=1),
+            "P5 (%)": quantiles[0],
+            "P25 (%)": quantiles[1],
+            "Médiane (%)": quantiles[2],
+            "P75 (%)": quantiles[3],
+            "P95 (%)": quantiles[4],
+            "Part au-dessus de 35 % (%)": au_dessus_seuil / nombre_prets * 100,
+            "Part capital > valeur du bien (%)": capital_superieur_valeur / nombre_prets * 100,
+        })
+        if not avec_details:
+            return df_synthese
+        # Copie avant la libération de la mémoire partagée
+        df_details = pd.DataFrame(taux_endettement.T.copy(), columns=[scenario["nom"] for scenario in scenarios])
+        return df_synthese, df_details
+    finally:
+        for memoire in memoires.values():
+            memoire.close()
+            memoire.unlink()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress test d'un portefeuille de prêts immobiliers")
+    parser.add_argument("--prets", type=int, default=100_000, help="Nombre de prêts du portefeuille généré")
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus de calcul")
+    parser.add_argument("--enregistrer", default=None, help="Nom sous lequel enregistrer les résultats dans le cache")
+    arguments = parser.parse_args()
+
+    debut = time.perf_counter()
+    # Le détail par prêt (scénarios × prêts) n'est copié que pour être enregistré
+    resultats = executer_stress_test(generer_portefeuille(arguments.prets), nombre_processus=arguments.processus,
+                                     avec_details=bool(arguments.enregistrer))
+    duree = time.perf_counter() - debut
+    if not arguments.enregistrer:
+        df_stress = resultats
+    else:
+        df_stress, df_details = resultats
+        metadonnees = {"prets": arguments.prets, "scenarios": SCENARIOS_PAR_DEFAUT}
+        enregistrer_resultats(df_stress, f"{arguments.enregistrer}_synthese", metadonnees)
+        enregistrer_resultats(df_details, f"{arguments.enregistrer}_details", metadonnees)
+    print(df_stress.round(2).to_string(index=False))
+    print(f"{arguments.prets} prêts, {len(SCENARIOS_PAR_DEFAUT)} scénarios en {duree:.2f} s")
@@ -0,0 +1,234 @@
+import sys
+from decimal import ROUND_HALF_UP, Decimal, getcontext
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from calculs_financement import (calculer_financement_centimes, calculer_taeg, calculer_taeg_scalaire, diviser_centimes,
+                                 en_centimes, facteur_annuite, facteur_annuite_exact, table_facteurs_annuite,
+                                 tableau_amortissement_centimes, taeg_depuis_simulation)
+from portefeuille import generer_portefeuille
+
+# Mode centimes : les sommes de l'échéancier doivent égaler les totaux au centime près,
+# et l'échéancier doit être identique à un déroulé indépendant en Decimal.
+
+getcontext().prec = 50
+CENTIME = Decimal("0.01")
+PROJET = {
+    "revenu_annuel": 60000.0, "valeur_bien": 200000.0, "apport": 30000.0, "taux_interet": 0.035,
+    "duree_pret_annees": 25, "assurance_annuelle": 595.0, "frais_notaire": 15000.0, "frais_garantie": 2550.0,
+    "frais_dossier": 1360.0, "frais_courtage": 1700.0, "frais_agence": 8000.0, "ptz": 0.0, "pel": 0.0,
+}
+# Montant total financé du projet type : prêt, frais et assurance de toute la durée
+MONTANT_TOTAL_FINANCE = 170000.0 + 15000.0 + 2550.0 + 1360.0 + 1700.0 + 8000.0 + 595.0 * 25
+
+CAS_LIMITES = {
+    "taux_nul": {"taux_interet": 0.0},
+    "taux_nul_sans_frais": {"taux_interet": 0.0, "assurance_annuelle": 0.0, "frais_notaire": 0.0,
+                            "frais_garantie": 0.0, "frais_dossier": 0.0, "frais_courtage": 0.0, "frais_agence": 0.0},
+    "pret_sur_un_an": {"duree_pret_annees": 1},
+    "ptz_egal_au_montant_finance": {"ptz": MONTANT_TOTAL_FINANCE},
+    "taux_eleve_duree_longue": {"taux_interet": 0.149, "duree_pret_annees": 40},
+}
+
+
+def en_entrees_centimes(simulation):
+    return {nom: valeur if nom == "taux_interet" else
+            np.asarray(valeur).astype(np.int64) if nom == "duree_pret_annees" else en_centimes(valeur)
+            for nom, valeur in simulation.items()}
+
+
+def portefeuille_aleatoire():
+    return en_entrees_centimes(generer_portefeuille(500, graine=12))
+
+
+def cas_limite(nom):
+    return en_entrees_centimes({nom_saisie: np.array([valeur]) for nom_saisie, valeur in {**PROJET, **CAS_LIMITES[nom]}.items()})
+
+
+PORTEFEUILLES = [pytest.param(portefeuille_aleatoire, id="aleatoire")] + [
+    pytest.param(lambda nom=nom: cas_limite(nom), id=nom) for nom in CAS_LIMITES
+]
+
+
+def echeancier_decimal(capital, taux_interet, duree_mois, assurance_annuelle):
+    """
+    Déroule l'échéancier d'un prêt en Decimal, indépendamment de l'implémentation en entiers :
+    mensualité théorique par la formule d'annuité, intérêts mensuels arrondis au centime (moitié
+    en s'éloignant de zéro), dernière échéance soldant le capital, douzième prime d'assurance
+    de chaque année complétant la prime annuelle.
+    """
+    capital = Decimal(int(capital)) / 100
+    taux_annuel = Decimal(round(float(taux_interet) * 1_000_000)) / 1_000_000
+    taux_mensuel = taux_annuel / 12
+    assurance_annuelle = Decimal(int(assurance_annuelle)) / 100
+    if taux_mensuel:
+        mensualite = capital * taux_mensuel / (1 - (1 + taux_mensuel) ** -duree_mois)
+    else:
+        mensualite = capital / duree_mois
+    mensualite = mensualite.quantize(CENTIME, rounding=ROUND_HALF_UP)
+    assurance_mensuelle = (assurance_annuelle / 12).quantize(CENTIME, rounding=ROUND_HALF_UP)
+
+    lignes = []
+    capital_restant = capital
+    for mois in range(1, duree_mois + 1):
+        # Division par 12 en dernier : le taux mensuel n'a pas d'écriture décimale finie
+        interets = (capital_restant * taux_annuel / 12).quantize(CENTIME, rounding=ROUND_HALF_UP)
+        paiement = capital_restant + interets if mois == duree_mois else mensualite
+        assurance = assurance_annuelle - 11 * assurance_mensuelle if mois % 12 == 0 else assurance_mensuelle
+        capital_restant -= paiement - interets
+        lignes.append((paiement, interets, paiement - interets, assurance, capital_restant))
+    return mensualite, lignes
+
+
+def en_centimes_decimal(valeur):
+    return int((valeur * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize("portefeuille", PORTEFEUILLES)
+def test_sommes_echeancier_egales_aux_totaux(portefeuille):
+    entrees = portefeuille()
+    resultats = calculer_financement_centimes(**entrees)
+    echeancier = tableau_amortissement_centimes(resultats["montant_total_finance"], entrees["taux_interet"],
+                                                entrees["duree_pret_annees"], resultats["mensualite"],
+                                                entrees["assurance_annuelle"])
+
+    np.testing.assert_array_equal(echeancier["capital"].sum(axis=-1), resultats["montant_total_finance"])
+    np.testing.assert_array_equal(echeancier["interets"].sum(axis=-1), resultats["interets_echeancier"])
+    np.testing.assert_array_equal(echeancier["assurance"].sum(axis=-1),
+                                  entrees["assurance_annuelle"] * entrees["duree_pret_annees"])
+    np.testing.assert_array_equal((echeancier["mensualite"] + echeancier["assurance"]).sum(axis=-1),
+                                  resultats["paiement_total"])
+    # Les échéanciers de durées différentes sont complétés par des zéros jusqu'à la durée la plus longue
+    dernier_mois = (entrees["duree_pret_annees"] * 12 - 1)[..., None]
+    np.testing.assert_array_equal(np.take_along_axis(echeancier["mensualite"], dernier_mois, axis=-1)[..., 0],
+                                  resultats["derniere_mensualite"])
+    np.testing.assert_array_equal(echeancier["capital_restant"][..., -1], 0)
+
+
+@pytest.mark.parametrize("portefeuille", PORTEFEUILLES)
+def test_echeancier_identique_au_calcul_decimal(portefeuille):
+    entrees = portefeuille()
+    resultats = calculer_financement_centimes(**entrees)
+    echeancier = tableau_amortissement_centimes(resultats["montant_total_finance"], entrees["taux_interet"],
+                                                entrees["duree_pret_annees"], resultats["mensualite"],
+                                                entrees["assurance_annuelle"])
+
+    for indice in range(len(resultats["montant_total_finance"]))[:100]:
+        duree_mois = int(entrees["duree_pret_annees"][indice]) * 12
+        mensualite, lignes = echeancier_decimal(resultats["montant_total_finance"][indice], entrees["taux_interet"][indice],
+                                                duree_mois, entrees["assurance_annuelle"][indice])
+        assert en_centimes_decimal(mensualite) == resultats["mensualite"][indice]
+        attendu = np.array([[en_centimes_decimal(valeur) for valeur in ligne] for ligne in lignes]).T
+        obtenu = np.array([echeancier[nom][indice, :duree_mois]
+                           for nom in ("mensualite", "interets", "capital", "assurance", "capital_restant")])
+        np.testing.assert_array_equal(obtenu, attendu)
+
+
+def test_pel_superieur_au_montant_finance_ramene_a_zero():
+    # Le PEL dépasse le besoin : rien n'est emprunté, seule l'assurance reste due
+    entrees = en_entrees_centimes({nom: np.array([valeur])
+                                   for nom, valeur in {**PROJET, "pel": MONTANT_TOTAL_FINANCE + 1234.56}.items()})
+    resultats = calculer_financement_centimes(**entrees)
+    echeancier = tableau_amortissement_centimes(resultats["montant_total_finance"], entrees["taux_interet"],
+                                                entrees["duree_pret_annees"], resultats["mensualite"],
+                                                entrees["assurance_annuelle"])
+
+    np.testing.assert_array_equal(resultats["montant_total_finance"], 0)
+    np.testing.assert_array_equal(resultats["mensualite"], 0)
+    np.testing.assert_array_equal(resultats["derniere_mensualite"], 0)
+    for nom in ("mensualite", "interets", "capital", "capital_restant"):
+        np.testing.assert_array_equal(echeancier[nom], 0)
+    np.testing.assert_array_equal(resultats["paiement_total"], entrees["assurance_annuelle"] * entrees["duree_pret_annees"])
+
+
+def test_en_centimes_arrondit_le_demi_centime_en_s_eloignant_de_zero():
+    montants = ["0.005", "0.015", "1.005", "2.675", "12.345", "0.004", "-0.005", "-1.005", "-2.675", "1234567.895"]
+    attendus = [en_centimes_decimal(Decimal(montant)) for montant in montants]
+    np.testing.assert_array_equal(en_centimes([float(montant) for montant in montants]), attendus)
+    assert attendus[:3] == [1, 2, 101] and attendus[6] == -1
+
+
+@pytest.mark.parametrize("diviseur", [2, 12, 24, 12_000_000])
+def test_diviser_centimes_arrondit_le_demi_centime_en_s_eloignant_de_zero(diviseur):
+    centimes = np.concatenate([np.arange(-5 * diviseur, 5 * diviseur + 1, max(1, diviseur // 24)),
+                               np.array([diviseur // 2, -(diviseur // 2), 3 * diviseur // 2, 10**15 + diviseur // 2])])
+    attendus = [int((Decimal(int(valeur)) / diviseur).to_integral_value(rounding=ROUND_HALF_UP)) for valeur in centimes]
+    np.testing.assert_array_equal(diviser_centimes(centimes, diviseur), attendus)
+
+
+# TAEG : le solveur vectorisé doit retrouver npf.rate prêt par prêt, et traiter explicitement
+# le taux nul et les prêts sans capital mis à disposition.
+
+def test_taeg_identique_a_npf_rate():
+    generateur = np.random.default_rng(3)
+    nombre_prets = 2000
+    capital = generateur.uniform(5_000, 800_000, nombre_prets)
+    duree_mois = generateur.integers(1, 41, nombre_prets) * 12
+    taux_interet = generateur.uniform(0.0001, 0.15, nombre_prets)
+    # Frais et assurance financés : le capital mis à disposition est inférieur au montant remboursé
+    capital_net = capital * generateur.uniform(0.85, 1.0, nombre_prets)
+    mensualite = np.round(capital * facteur_annuite_exact(taux_interet, duree_mois), 2)
+
+    taeg = calculer_taeg(capital_net, mensualite, duree_mois)
+    assert not np.isnan(taeg).any()
+    # npf.rate s'arrête à une tolérance de l'ordre de 1e-9 sur le taux : le solveur vectorisé est plus précis
+    np.testing.assert_allclose(taeg, calculer_taeg_scalaire(capital_net, mensualite, duree_mois), rtol=0, atol=1e-8)
+    taux_mensuel = np.expm1(np.log1p(taeg) / 12)
+    valeur_actuelle = mensualite * -np.expm1(-duree_mois * np.log1p(taux_mensuel)) / taux_mensuel
+    np.testing.assert_allclose(valeur_actuelle, capital_net, rtol=0, atol=1e-4)
+    assert (taeg >= taux_interet - 1e-9).all()
+
+
+def test_taeg_nul_a_taux_nul_sans_frais():
+    capital_net = np.array([120_000.0, 1_000.0, 100_000.0, 1_000.0])
+    duree_mois = np.array([240, 12, 300, 12])
+    # Mensualités exactes, puis arrondies au centime inférieur : jusqu'à un demi-centime manquant par échéance
+    mensualite = np.array([500.0, 83.33, 333.33, 83.30])
+
+    taeg = calculer_taeg(capital_net, mensualite, duree_mois)
+    np.testing.assert_allclose(taeg[:3], 0.0, rtol=0, atol=1e-12)
+    # Au-delà de l'arrondi, les remboursements ne couvrent pas le capital : pas de TAEG
+    assert np.isnan(taeg[3])
+
+
+def test_taeg_non_defini_sans_capital_mis_a_disposition():
+    # PTZ couvrant le prêt : le montant financé ne couvre plus que les frais et l'assurance
+    montant_total_finance = 13_485.0
+    mensualite = np.round(montant_total_finance * facteur_annuite_exact(0.035, 300), 2)
+    taeg = taeg_depuis_simulation(montant_total_finance, mensualite, 595.0, 25, 1360.0, 2550.0, 1700.0)
+    assert np.isnan(taeg)
+    assert np.isnan(calculer_taeg([0.0, -500.0], [100.0, 100.0], [12, 12])).all()
+
+
+# Table des facteurs d'annuité : lecture directe sur la grille, formule en dehors.
+
+def test_table_facteurs_identique_a_la_formule():
+    points_base = np.arange(0, 1501)[:, None]
+    duree_mois = np.arange(12, 481)[None, :]
+    np.testing.assert_allclose(table_facteurs_annuite(), facteur_annuite_exact(points_base / 10_000, duree_mois),
+                               rtol=1e-14, atol=0)
+
+
+@pytest.mark.parametrize("taux_interet, duree_mois", [
+    (0.0, 300), (0.035, 300), (0.1499, 480), (0.15, 480), (0.15, 12), (0.0001, 12),
+])
+def test_facteur_annuite_lu_dans_la_table(taux_interet, duree_mois):
+    assert facteur_annuite(taux_interet, duree_mois) == table_facteurs_annuite()[round(taux_interet * 10_000), duree_mois - 12]
+    assert facteur_annuite(taux_interet, duree_mois) == pytest.approx(float(facteur_annuite_exact(taux_interet, duree_mois)),
+                                                                      rel=1e-14)
+
+
+@pytest.mark.parametrize("taux_interet, duree_mois", [
+    (0.03456, 300),    # taux hors grille
+    (0.1501, 300),     # au-delà de 15 %
+    (1.0, 300),        # taux maximal du plan de financement
+    (0.035, 300.5),    # durée fractionnaire, non tronquée
+    (0.035, 6),        # durée inférieure à la table
+    (0.035, 600),      # durée supérieure à la table
+    (-0.01, 300),      # taux négatif
+])
+def test_facteur_annuite_hors_table_par_la_formule(taux_interet, duree_mois):
+    assert facteur_annuite(taux_interet, duree_mois) == float(facteur_annuite_exact(taux_interet, duree_mois))
@@ -0,0 +1,81 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from calculs_financement import calculer_financement
+from graphe_simulation import CALCULS, SAISIES, GrapheSimulation
+
+# Recalcul incrémental : une modification ne recalcule que les descendants de la saisie modifiée,
+# une saisie fixée coupe la propagation depuis l'amont et libérer une saisie rétablit sa valeur par défaut.
+
+
+@pytest.fixture
+def graphe():
+    graphe = GrapheSimulation()
+    graphe.recalculer()
+    return graphe
+
+
+def test_premier_calcul_complet():
+    assert set(GrapheSimulation().recalculer()) == set(SAISIES) | set(CALCULS)
+
+
+def test_revenu_annuel_ne_recalcule_que_le_taux_endettement(graphe):
+    mensualite = graphe.valeur("mensualite")
+    graphe.definir("revenu_annuel", 72000.0)
+    assert set(graphe.recalculer()) == {"revenu_annuel", "revenu_mensuel", "taux_endettement"}
+    assert graphe.valeur("revenu_mensuel") == 6000.0
+    assert graphe.valeur("mensualite") == mensualite
+
+
+def test_meme_valeur_sans_recalcul(graphe):
+    graphe.definir("revenu_annuel", 72000.0)
+    graphe.recalculer()
+    graphe.definir("revenu_annuel", 72000.0)
+    assert graphe.recalculer() == []
+
+
+def test_saisie_deduite_fixee_coupe_la_propagation(graphe):
+    graphe.definir("apport_personnel", 50000.0)
+    graphe.recalculer()
+    graphe.definir("valeur_bien", 300000.0)
+    recalcules = set(graphe.recalculer())
+
+    assert "apport_personnel" not in recalcules
+    assert graphe.valeur("apport_personnel") == 50000.0
+    # Les autres saisies déduites de la valeur du bien suivent toujours
+    assert {"frais_de_notaire", "frais_agence_immobiliere", "montant_pret", "mensualite"} <= recalcules
+    assert graphe.valeur("frais_de_notaire") == 22500.0
+    assert graphe.valeur("montant_pret") == 250000.0
+
+
+def test_liberer_retablit_la_valeur_par_defaut(graphe):
+    mensualite = graphe.valeur("mensualite")
+    graphe.definir("frais_de_notaire", 1000.0)
+    graphe.recalculer()
+    assert graphe.valeur("mensualite") < mensualite
+
+    graphe.liberer("frais_de_notaire")
+    recalcules = set(graphe.recalculer())
+    assert not graphe.est_fixee("frais_de_notaire")
+    assert graphe.valeur("frais_de_notaire") == round(0.075 * graphe.valeur("valeur_bien"), 2)
+    assert graphe.valeur("mensualite") == mensualite
+    assert "revenu_mensuel" not in recalcules
+    # Libérer une saisie qui n'est pas fixée ne recalcule rien
+    graphe.liberer("frais_de_notaire")
+    assert graphe.recalculer() == []
+
+
+def test_resultats_identiques_a_calculer_financement(graphe):
+    for nom, valeur in {"valeur_bien": 320000.0, "apport_personnel": 40000.0, "taux_interet": 4.1, "duree_pret": 20}.items():
+        graphe.definir(nom, valeur)
+    saisies = {nom: graphe.valeur(nom) for nom in SAISIES}
+    resultats = calculer_financement(
+        saisies["revenu_annuel"], saisies["valeur_bien"], saisies["apport_personnel"], saisies["taux_interet"] / 100,
+        saisies["duree_pret"], saisies["assurance_emprunteur_annuelle"], saisies["frais_de_notaire"],
+        saisies["frais_de_garantie"], saisies["frais_de_dossier"], saisies["frais_de_courtage"],
+        saisies["frais_agence_immobiliere"], saisies["ptz"], saisies["pel"])
+    for nom, valeur in resultats.items():
+        assert graphe.valeur(nom) == pytest.approx(float(valeur), abs=1e-9), nom